@@ -1,90 +1,43 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from datetime import datetime
-from supabase import create_client, Client
-import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache, partial
 import logging
 import os
 import re
 from typing import Optional
 
-class SixvoxComissaoScraper:
-    def __init__(self):
-        # Obtém as credenciais das variáveis de ambiente
-        self.supabase_url: str = os.environ.get('SUPABASE_URL_2', '')
-        self.supabase_key: str = os.environ.get('SUPABASE_KEY_2', '')
-        self.login_email: str = os.environ.get('LOGIN', '')
-        self.login_senha: str = os.environ.get('SENHA', '')
-        
-        if not all([self.supabase_url, self.supabase_key, self.login_email, self.login_senha]):
-            raise ValueError("Variáveis de ambiente necessárias não encontradas")
-            
-        self.driver: Optional[webdriver.Chrome] = None
-        # Inicializando o cliente Supabase com type hints
-        self.supabase: Client = create_client(
-            supabase_url=self.supabase_url,
-            supabase_key=self.supabase_key
-        )
-        
-        # Configuração do logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+from conversores import data_iso
+from esperas import EsperaAdaptativa
+from esquema import Campo, Esquema, memorizar
+import transformacao_vetorizada as vetorizada
+from extracao import ExtratorTabela
+from relatorio_http import ClienteHttpSixvox, buscar_relatorio_particionado, gerar_particoes
+from scraper_relatorio import ScraperRelatorio
+from sessao_sixvox import SessaoSixvox
+from transformacao_paralela import transformar_em_paralelo
+
+# Valor entre parênteses, ex.: 'HAPVIDA CLINIPAM (266)' -> '266'
+PADRAO_SKU = re.compile(r'\((.*?)\)')
+
+class SixvoxComissaoScraper(ScraperRelatorio):
+    tabela = 'comissoes'
+    chaves = ('proposta', 'parcela')
+    relatorio = 'comissoes'
+
+    def __init__(self, sessao: Optional[SessaoSixvox] = None):
+        super().__init__(sessao, 'SUPABASE_URL_2', 'SUPABASE_KEY_2')
+        # SIXVOX_MODO=particionado: como http, mas dividido em intervalos de datas buscados em paralelo
+        modo = os.environ.get('SIXVOX_MODO', '')
+        self.modo_http = modo in ('http', 'particionado')
+        self.modo_particionado = modo == 'particionado'
+        # SIXVOX_TRANSFORMACAO_PROCESSOS=N transforma relatórios grandes em N processos
+        self.processos_transformacao = int(os.environ.get('SIXVOX_TRANSFORMACAO_PROCESSOS', '0'))
+        self.minimo_linhas_paralelo = int(os.environ.get('SIXVOX_TRANSFORMACAO_MINIMO', '20000'))
         logging.info("Cliente Supabase inicializado com sucesso")
     
-    def setup_driver(self, headless=True):
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument('--headless=new')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        service = Service()
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        logging.info("Driver do Chrome inicializado com sucesso" + (" em modo headless" if headless else " em modo visual"))
-    
-    def login(self):
-        try:
-            self.setup_driver(headless=True)
-            self.driver.get("http://vhseguro.sixvox.com.br/")
-            
-            # Espera o campo de email estar disponível
-            email = WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="email"]'))
-            )
-            email.clear()
-            email.send_keys(self.login_email)
-            
-            # Preenche a senha
-            password = self.driver.find_element(By.XPATH, '//*[@id="xenha"]')
-            password.clear()
-            password.send_keys(self.login_senha)
-            
-            # Clica no botão de login
-            login_button = self.driver.find_element(By.XPATH, '//*[@id="enviar"]')
-            login_button.click()
-            
-            # Aguarda redirecionamento após login
-            time.sleep(3)
-            logging.info("Login realizado com sucesso!")
-            return True
-        except Exception as e:
-            logging.error(f"Erro durante o login: {str(e)}")
-            return False
-
-    def navegar_para_relatorio_comissao(self):
+    def navegar_para_relatorio(self, aguardar=True):
         try:
             actions = [
                 ('//*[@id="menu_relatorios"]', "click", "Menu Relatórios"),
@@ -93,25 +46,23 @@ class SixvoxComissaoScraper:
                 ("//input[contains(@onclick, 'command_argument') and contains(@onclick, 'alterar') and contains(@onclick, '64')]", "js_click", "Seleção de Relatório"),
             ]
             
+            espera = EsperaAdaptativa(self.driver, timeout_padrao=25)
             for xpath, action_type, description in actions:
-                time.sleep(3)
-                element = WebDriverWait(self.driver, 25).until(
-                    EC.element_to_be_clickable((By.XPATH, xpath))
-                )
+                element = espera.elemento((By.XPATH, xpath), description)
                 
                 if action_type == "click":
                     self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                    time.sleep(1)
                     element.click()
                 elif action_type == "js_click":
                     self.driver.execute_script("arguments[0].click();", element)
                     
                 logging.info(f"Ação realizada: {description}")
+                espera.dom_estavel(f"{description} estabilizado")
             
             # Marca o checkbox saude_dental se existir
             try:
-                checkbox = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.XPATH, '//*[@id="saude_dental"]'))
+                checkbox = espera.elemento(
+                    (By.XPATH, '//*[@id="saude_dental"]'), "Checkbox saude_dental", timeout=10, condicao=EC.presence_of_element_located
                 )
                 if not checkbox.is_selected():
                     checkbox.click()
@@ -120,19 +71,21 @@ class SixvoxComissaoScraper:
                 logging.info("Checkbox saude_dental não encontrado ou já marcado")
             
             # Executa o relatório
-            submit_button = WebDriverWait(self.driver, 25).until(
-                EC.element_to_be_clickable((By.XPATH, "//input[@type='submit' and @value='Executar Relatório' and @name='gerar']"))
+            submit_button = espera.elemento(
+                (By.XPATH, "//input[@type='submit' and @value='Executar Relatório' and @name='gerar']"), "Botão Executar Relatório"
             )
+            if not aguardar:
+                # Dispara o relatório sem bloquear; quem chamou acompanha o carregamento
+                self.driver.execute_script("setTimeout(() => arguments[0].click(), 0);", submit_button)
+                logging.info("Relatório solicitado, carregamento acompanhado em paralelo")
+                return True
             submit_button.click()
             
             logging.info("Aguardando carregamento do relatório de comissões...")
-            time.sleep(20)
             
             # Verificar se a tabela foi carregada
             try:
-                WebDriverWait(self.driver, 45).until(
-                    EC.presence_of_element_located((By.XPATH, "//tr[@class='Freezing']"))
-                )
+                espera.relatorio((By.XPATH, "//tr[@class='Freezing']"), "Relatório de comissões", timeout=120)
                 logging.info("Relatório de comissões carregado com sucesso!")
                 return True
             except Exception as wait_error:
@@ -151,7 +104,8 @@ class SixvoxComissaoScraper:
             logging.error(f"Erro durante a navegação para relatório de comissões: {str(e)}")
             return False
 
-    def limpar_valor_monetario(self, valor):
+    @staticmethod
+    def limpar_valor_monetario(valor):
         """Remove símbolos monetários e converte para float"""
         if not valor or valor == '':
             return 0.0
@@ -176,10 +130,15 @@ class SixvoxComissaoScraper:
             logging.warning(f"Erro ao converter valor monetário '{valor}': {str(e)}")
             return 0.0
     
-    def converter_data(self, data_str):
+    @staticmethod
+    def converter_data(data_str):
         """Converte string de data para formato YYYY-MM-DD"""
         if not data_str or str(data_str).strip() == '':
             return None
+        # Caminho rápido para o DD/MM/YYYY canônico; os demais formatos seguem pelo strptime
+        convertida = data_iso(str(data_str))
+        if convertida is not None:
+            return convertida
         
         try:
             data_limpa = str(data_str).strip()
@@ -207,11 +166,87 @@ class SixvoxComissaoScraper:
             logging.warning(f"Erro ao converter data '{data_str}': {str(e)}")
             return None
 
-    def extrair_sku(self, texto):
+    @staticmethod
+    def texto(valor):
+        return str(valor).strip()
+
+    @staticmethod
+    def safe_int_convert(value, default=0):
+        """Conversão segura de inteiros (parcela, códigos, vidas)"""
+        if not value or str(value).strip() == '':
+            return default
+        try:
+            return int(''.join(filter(str.isdigit, str(value))) or default)
+        except (ValueError, TypeError):
+            return default
+
+    @staticmethod
+    def safe_percent_convert(value):
+        """Conversão segura de percentual"""
+        if not value or str(value).strip() == '':
+            return 0.0
+        try:
+            clean_value = str(value).replace('%', '').replace(',', '.').strip()
+            return float(clean_value) if clean_value else 0.0
+        except (ValueError, TypeError):
+            return 0.0
+
+    @classmethod
+    def montar_esquema(cls):
+        """Mapeamento correto baseado na estrutura real do HTML do relatório de comissões"""
+        # Os mesmos valores de célula se repetem milhares de vezes no relatório: conversões memorizadas
+        extrair_sku = memorizar(cls.extrair_sku)
+        converter_data = memorizar(cls.converter_data, 1024)
+        limpar_valor_monetario = memorizar(cls.limpar_valor_monetario)
+        safe_percent_convert = memorizar(cls.safe_percent_convert, 1024)
+
+        return Esquema([
+            # Informações básicas da venda (baseado na ordem real)
+            Campo('vigencia', 0, converter_data, vetorizado=vetorizada.data('%Y-%m-%d')),  # 15/11/2015
+            Campo('status', 1, cls.texto, '', vetorizada.texto),  # Ativa
+            Campo('corretor', 2, cls.texto, '', vetorizada.texto),  # Bruno Ravasco de Almeida - Corretor (4837)
+            Campo('proposta', 3, cls.texto, '', vetorizada.texto),  # 3613834
+            Campo('titular', 4, cls.texto, '', vetorizada.texto),  # ROSEMEIRE GOMES
+            Campo('tipo', 5, cls.texto, '', vetorizada.texto),  # PF
+            Campo('operadora', 6, cls.texto, '', vetorizada.texto),  # HAPVIDA CLINIPAM (266)
+            Campo('administradora', 7, cls.texto, '', vetorizada.texto),  # -DIRETO
+            Campo('parcela', 8, cls.safe_int_convert, 0, vetorizada.inteiro_digitos),  # 1
+            Campo('base_de_calculo', 9, limpar_valor_monetario, 0.0, vetorizada.monetario),  # R$ 737,94
+            Campo('data_repasse', 10, converter_data, vetorizado=vetorizada.data('%Y-%m-%d')),  # 17/12/2024
+            Campo('percentual_comissao', 11, safe_percent_convert, 0.0, vetorizada.percentual),  # 100.00
+            Campo('valor_comissao', 12, limpar_valor_monetario, 0.0, vetorizada.monetario),  # R$ 813,41
+            Campo('percentual_corretor', 13, safe_percent_convert, 0.0, vetorizada.percentual),  # 100.00
+            Campo('comissao_paga_corretor', 14, limpar_valor_monetario, 0.0, vetorizada.monetario),  # R$ 737,94
+            Campo('comissao_a_pagar', 15, limpar_valor_monetario, 0.0, vetorizada.monetario),  # R$ 737,94
+            Campo('supervisor', 16, cls.texto, '', vetorizada.texto),  # Leandro Lombardi (4489)
+            Campo('distribuidora', 17, cls.texto, '', vetorizada.texto),  # (vazio)
+            Campo('equipe', 18, cls.texto, '', vetorizada.texto),  # Leandro Lombardi (37)
+            Campo('cnpj_cpf', 19, cls.texto, '', vetorizada.texto),  # 12387735838
+            Campo('data_cadastro', 20, converter_data, vetorizado=vetorizada.data('%Y-%m-%d')),  # 06/11/2024
+            Campo('cod_regra_corretor', 21, cls.safe_int_convert, 0, vetorizada.inteiro_digitos),  # 956
+            Campo('cod_regra', 22, cls.safe_int_convert, 0, vetorizada.inteiro_digitos),  # 664
+            Campo('modalidade', 23, cls.texto, '', vetorizada.texto),  # INDIVIDUAL SAÚDE (182)
+            Campo('qtd_vidas', 24, cls.safe_int_convert, 0, vetorizada.inteiro_digitos),  # 1
+            Campo('vencimento', 25, converter_data, vetorizado=vetorizada.data('%Y-%m-%d')),  # 15/11/2024
+            Campo('comissao_paga_supervisor', 26, limpar_valor_monetario, 0.0, vetorizada.monetario),  # R$ 0,00
+            Campo('comissao_paga_gerente', 27, limpar_valor_monetario, 0.0, vetorizada.monetario),  # R$ 0,00
+            Campo('comissao_paga_parceiro1', 28, limpar_valor_monetario, 0.0, vetorizada.monetario),  # R$ 0,00
+            Campo('comissao_paga_parceiro2', 29, limpar_valor_monetario, 0.0, vetorizada.monetario),  # R$ 0,00
+            Campo('tipo_corretor', 30, cls.texto, '', vetorizada.texto),  # DIAMOND
+
+            # SKUs extraídos para melhor análise
+            Campo('sku_corretor', 2, extrair_sku, vetorizado=vetorizada.sku),  # (4837)
+            Campo('sku_modalidade', 23, extrair_sku, vetorizado=vetorizada.sku),  # (266)
+            Campo('sku_operadora', 6, extrair_sku, vetorizado=vetorizada.sku),  # (182)
+            Campo('sku_administradora', None),  # Não há SKU para administradora neste caso (-DIRETO)
+        ])
+
+    @staticmethod
+    def extrair_sku(texto):
         """Extrai o valor entre parênteses de um texto"""
         if not texto:
             return None
-        match = re.search(r'\((.*?)\)', texto)
+        match = PADRAO_SKU.search(texto)
         return match.group(1) if match else None
 
     def converter_percentual(self, valor_str):
@@ -223,217 +258,143 @@ class SixvoxComissaoScraper:
         except ValueError:
             return 0.0
 
-    def extrair_dados_tabela_comissao(self):
-        try:
-            logging.info("Iniciando extração dos dados de comissões...")
-            
-            # Script JavaScript otimizado para extrair dados
-            script_extracao = """
-                const rows = Array.from(document.querySelectorAll('tr')).filter(row => 
-                    !row.classList.contains('Freezing') && 
-                    row.cells.length > 0 && 
-                    row.cells[0] && 
-                    row.cells[0].innerText.trim() !== '' &&
-                    row.cells[0].innerText.includes('/')
-                );
-                return rows.map(row => Array.from(row.cells).map(cell => cell.innerText.trim()));
-            """
-            
-            raw_data = self.driver.execute_script(script_extracao)
-            dados = []
-            
-            logging.info(f"Processando {len(raw_data)} registros de comissões...")
-            
-            # Para debug - mostrar as primeiras 5 linhas dos dados brutos
-            for i, row in enumerate(raw_data[:5]):
-                logging.info(f"DEBUG - Linha {i+1} dados brutos ({len(row)} colunas): {row}")
-            
-            batch_size = 100
-            for i in range(0, len(raw_data), batch_size):
-                batch = raw_data[i:i+batch_size]
-                batch_processed = []
-                
-                for row_index, row in enumerate(batch):
-                    try:
-                        # Validação básica do número de colunas - adaptável
-                        if len(row) < 15:
-                            logging.warning(f"Linha {i + row_index + 1} com apenas {len(row)} colunas - pulando")
-                            continue
-                        
-                        # Conversão segura de parcela
-                        def safe_int_convert(value, default=0):
-                            if not value or str(value).strip() == '':
-                                return default
-                            try:
-                                return int(''.join(filter(str.isdigit, str(value))) or default)
-                            except (ValueError, TypeError):
-                                return default
-                        
-                        # Conversão segura de percentual
-                        def safe_percent_convert(value):
-                            if not value or str(value).strip() == '':
-                                return 0.0
-                            try:
-                                clean_value = str(value).replace('%', '').replace(',', '.').strip()
-                                return float(clean_value) if clean_value else 0.0
-                            except (ValueError, TypeError):
-                                return 0.0
-                        
-                        # Mapeamento correto baseado na estrutura real do HTML
-                        registro = {
-                            # Informações básicas da venda (baseado na ordem real)
-                            'vigencia': self.converter_data(row[0]) if len(row) > 0 else None,  # 15/11/2015
-                            'status': str(row[1]).strip() if len(row) > 1 else '',  # Ativa
-                            'corretor': str(row[2]).strip() if len(row) > 2 else '',  # Bruno Ravasco de Almeida - Corretor (4837)
-                            'proposta': str(row[3]).strip() if len(row) > 3 else '',  # 3613834
-                            'titular': str(row[4]).strip() if len(row) > 4 else '',  # ROSEMEIRE GOMES
-                            'tipo': str(row[5]).strip() if len(row) > 5 else '',  # PF
-                            'operadora': str(row[6]).strip() if len(row) > 6 else '',  # HAPVIDA CLINIPAM (266)
-                            'administradora': str(row[7]).strip() if len(row) > 7 else '',  # -DIRETO
-                            'parcela': safe_int_convert(row[8]) if len(row) > 8 else 0,  # 1
-                            'base_de_calculo': self.limpar_valor_monetario(row[9]) if len(row) > 9 else 0.0,  # R$ 737,94
-                            'data_repasse': self.converter_data(row[10]) if len(row) > 10 else None,  # 17/12/2024
-                            'percentual_comissao': safe_percent_convert(row[11]) if len(row) > 11 else 0.0,  # 100.00
-                            'valor_comissao': self.limpar_valor_monetario(row[12]) if len(row) > 12 else 0.0,  # R$ 813,41
-                            'percentual_corretor': safe_percent_convert(row[13]) if len(row) > 13 else 0.0,  # 100.00
-                            'comissao_paga_corretor': self.limpar_valor_monetario(row[14]) if len(row) > 14 else 0.0,  # R$ 737,94
-                            'comissao_a_pagar': self.limpar_valor_monetario(row[15]) if len(row) > 15 else 0.0,  # R$ 737,94                            
-                            'supervisor': str(row[16]).strip() if len(row) > 16 else '',  # Leandro Lombardi (4489)
-                            'distribuidora': str(row[17]).strip() if len(row) > 17 else '',  # (vazio)
-                            'equipe': str(row[18]).strip() if len(row) > 18 else '',  # Leandro Lombardi (37)
-                            'cnpj_cpf': str(row[19]).strip() if len(row) > 19 else '',  # 12387735838
-                            'data_cadastro': self.converter_data(row[20]) if len(row) > 20 else None,  # 06/11/2024
-                            'cod_regra_corretor': safe_int_convert(row[21]) if len(row) > 21 else 0,  # 956
-                            'cod_regra': safe_int_convert(row[22]) if len(row) > 22 else 0,  # 664
-                            'modalidade': str(row[23]).strip() if len(row) > 23 else '',  # INDIVIDUAL SAÚDE (182)
-                            'qtd_vidas': safe_int_convert(row[24]) if len(row) > 24 else 0,  # 1
-                            'vencimento': self.converter_data(row[25]) if len(row) > 25 else None,  # 15/11/2024
-                            'comissao_paga_supervisor': self.limpar_valor_monetario(row[26]) if len(row) > 26 else 0.0,  # R$ 0,00
-                            'comissao_paga_gerente': self.limpar_valor_monetario(row[27]) if len(row) > 27 else 0.0,  # R$ 0,00
-                            'comissao_paga_parceiro1': self.limpar_valor_monetario(row[28]) if len(row) > 28 else 0.0,  # R$ 0,00
-                            'comissao_paga_parceiro2': self.limpar_valor_monetario(row[29]) if len(row) > 29 else 0.0,  # R$ 0,00
-                            'tipo_corretor': str(row[30]).strip() if len(row) > 30 else '',  # DIAMOND
-                            
-                            # SKUs extraídos para melhor análise
-                            'sku_corretor': self.extrair_sku(row[2]) if len(row) > 2 else None,  # (4837)
-                            'sku_modalidade': self.extrair_sku(row[23]) if len(row) > 23 else None,  # (266)
-                            'sku_operadora': self.extrair_sku(row[6]) if len(row) > 6 else None,  # (182)
-                            'sku_administradora': None  # Não há SKU para administradora neste caso (-DIRETO)
-                        }
-                        
-                        # Validação de qualidade dos dados
-                        if (registro['vigencia'] is not None and 
-                            registro['proposta'] and 
-                            len(registro['proposta'].strip()) > 0 and
-                            registro['corretor'] and 
-                            len(registro['corretor'].strip()) > 0):
-                            
-                            batch_processed.append(registro)
-                            
-                            # Log das primeiras 3 linhas processadas com sucesso
-                            if len(dados) + len(batch_processed) <= 3:
-                                logging.info(f"DEBUG - Registro {len(dados) + len(batch_processed)} processado:")
-                                logging.info(f"  Vigência: {registro['vigencia']}")
-                                logging.info(f"  Status: {registro['status']}")
-                                logging.info(f"  Proposta: {registro['proposta']}")
-                                logging.info(f"  Corretor: {registro['corretor'][:50]}...")
-                                logging.info(f"  Modalidade: {registro['modalidade']}")
-                                logging.info(f"  Operadora: {registro['operadora']}")
-                                logging.info(f"  Qtd Vidas: {registro['qtd_vidas']}")
-                                logging.info(f"  Tipo Corretor: {registro['tipo_corretor']}")
-                                logging.info(f"  Valor Comissão: {registro['valor_comissao']}")
-                                logging.info(f"  Vencimento: {registro['vencimento']}")
-                        else:
-                            logging.warning(f"Linha {i + row_index + 1} rejeitada - dados essenciais faltando")
-                            
-                    except Exception as row_error:
-                        logging.error(f"Erro ao processar linha {i + row_index + 1}: {str(row_error)}")
-                        continue
-                
-                dados.extend(batch_processed)
-                logging.info(f"Processado lote de {len(batch_processed)} registros... Total atual: {len(dados)}")
-            
-            # Mostrar amostra dos dados processados
-            if dados:
-                logging.info("Amostra dos primeiros 3 registros processados:")
-                for i, registro in enumerate(dados[:3]):
-                    logging.info(f"Registro {i+1}: Vigência={registro['vigencia']}, Proposta={registro['proposta']}, Corretor={registro['corretor'][:30]}...")
-                
-                logging.info(f"Extração de comissões concluída! Total de {len(dados)} registros válidos.")
-                return dados
-            else:
-                logging.warning("Nenhum registro válido foi encontrado após o processamento.")
-                return []
-            
-        except Exception as e:
-            logging.error(f"Erro ao extrair dados da tabela de comissões: {str(e)}")
-            return []
+    def linha_de_comissao(self, row):
+        """Mesmo filtro do script de extração: primeira célula preenchida com uma data"""
+        return bool(row) and row[0].strip() != '' and '/' in row[0]
 
-    def limpar_tabela_supabase(self):
-        try:
-            logging.info("Iniciando limpeza da tabela comissoes...")
-            response = self.supabase.table('comissoes').delete().neq('id', 0).execute()
-            logging.info("Tabela comissoes limpa com sucesso!")
-            return True
-        except Exception as e:
-            logging.error(f"Erro ao limpar tabela de comissões: {str(e)}")
-            return False
+    def buscar_relatorio_http(self):
+        """Obtém as linhas do relatório reenviando o formulário por HTTP, sem navegar no Chrome"""
+        if self.modo_particionado:
+            return self.buscar_relatorio_particionado()
+        with ClienteHttpSixvox(self.sessao) as cliente:
+            return cliente.buscar_relatorio('comissoes', filtro_linha=self.linha_de_comissao, colunas=self.esquema.colunas)
 
-    def salvar_comissoes_no_supabase(self, dados):
-        try:
-            if self.limpar_tabela_supabase():
-                logging.info(f"Salvando {len(dados)} registros de comissões no Supabase...")
-                
-                batch_size = 100
-                for i in range(0, len(dados), batch_size):
-                    batch = dados[i:i+batch_size]
-                    
-                    try:
-                        response = self.supabase.table('comissoes').insert(batch).execute()
-                        logging.info(f"Lote {i//batch_size + 1} salvo: {len(batch)} registros")
-                        time.sleep(0.5)
-                    except Exception as batch_error:
-                        logging.error(f"Erro ao salvar lote {i//batch_size + 1}: {str(batch_error)}")
-                        return False
-                
-                logging.info("Dados de comissões salvos com sucesso!")
-                return True
-            return False
-        except Exception as e:
-            logging.error(f"Erro ao salvar dados de comissões: {str(e)}")
-            return False
-    
-    def executar_scraping_comissoes(self):
-        try:
-            if not self.login():
-                raise Exception("Falha no login")
-                
-            if not self.navegar_para_relatorio_comissao():
-                raise Exception("Falha na navegação para o relatório de comissões")
-                
-            dados = self.extrair_dados_tabela_comissao()
-            if not dados:
-                raise Exception("Nenhum dado de comissão extraído")
-                
-            if not self.salvar_comissoes_no_supabase(dados):
-                raise Exception("Falha ao salvar dados de comissões no Supabase")
-                
-            logging.info("Processo de scraping de comissões concluído com sucesso!")
-            return True
+    def buscar_relatorio_particionado(self):
+        """Busca o histórico em fatias de vigência (ou data_repasse), conforme os campos de filtro configurados"""
+        campo_inicio = os.environ.get('SIXVOX_PARTICAO_CAMPO_INICIO', '')
+        campo_fim = os.environ.get('SIXVOX_PARTICAO_CAMPO_FIM', '')
+        if not all([campo_inicio, campo_fim]):
+            raise ValueError("SIXVOX_PARTICAO_CAMPO_INICIO e SIXVOX_PARTICAO_CAMPO_FIM são obrigatórios no modo particionado")
+
+        inicio = datetime.strptime(os.environ.get('SIXVOX_PARTICAO_INICIO', '01/01/2015'), '%d/%m/%Y').date()
+        meses = int(os.environ.get('SIXVOX_PARTICAO_MESES', '6'))
+        trabalhadores = int(os.environ.get('SIXVOX_PARTICAO_TRABALHADORES', '4'))
+        # SIXVOX_PARTICAO_CONFERIR=1 gera também o relatório sem partição e falha se as contagens divergirem
+        # (pega linhas sem a data do filtro, que nenhuma partição traz)
+        conferir = os.environ.get('SIXVOX_PARTICAO_CONFERIR', '') == '1'
+        # Vigências futuras também entram no relatório; datas fora da janela caem nas partições abertas das pontas
+        fim = date.today() + timedelta(days=366)
+
+        return buscar_relatorio_particionado(
+            self.sessao, 'comissoes', campo_inicio, campo_fim, gerar_particoes(inicio, fim, meses, abertas=True),
+            trabalhadores=trabalhadores, filtro_linha=self.linha_de_comissao, colunas=self.esquema.colunas,
+            conferir=conferir
+        )
+
+    def processar_lote(self, batch, inicio=0):
+        """Converte e valida um lote de linhas brutas; `inicio` é a posição da primeira linha no relatório.
+
+        Retorna (registros válidos, mensagens das linhas que deram erro).
+        """
+        return self.processar_linhas(self.esquema, self.transformacao_vetorizada, batch, inicio)
+
+    @staticmethod
+    def processar_linhas(esquema, transformacao_vetorizada, batch, inicio=0):
+        """processar_lote sem instância: só precisa do esquema e da opção de transformação (ver processar_lote_em_processo)"""
+        batch_processed = []
+        erros = []
+        
+        # Para debug - mostrar as primeiras 5 linhas dos dados brutos
+        if inicio == 0:
+            for j, row in enumerate(batch[:5]):
+                logging.info(f"DEBUG - Linha {j+1} dados brutos ({len(row)} colunas): {row}")
+        
+        # Como em converter_lote: no modo vetorizado o lote todo de uma vez, posições None seguem pelo esquema
+        linhas = [row for row in batch if len(row) >= 15]
+        convertidos = iter((vetorizada.converter_lote(esquema, linhas) if transformacao_vetorizada else None)
+                           or [None] * len(linhas))
+        for row_index, row in enumerate(batch):
+            try:
+                # Validação básica do número de colunas - adaptável
+                if len(row) < 15:
+                    logging.warning(f"Linha {inicio + row_index + 1} com apenas {len(row)} colunas - pulando")
+                    continue
                 
-        except Exception as e:
-            logging.error(f"Erro crítico durante a execução do scraping de comissões: {str(e)}")
-            return False
+                registro = next(convertidos) or esquema.converter(row)
                 
-        finally:
-            if self.driver:
-                self.driver.quit()
-                logging.info("Driver do Chrome encerrado")
+                # Validação de qualidade dos dados
+                if (registro['vigencia'] is not None and 
+                    registro['proposta'] and 
+                    len(registro['proposta'].strip()) > 0 and
+                    registro['corretor'] and 
+                    len(registro['corretor'].strip()) > 0):
+                    
+                    batch_processed.append(registro)
+                    
+                    # Log das primeiras 3 linhas processadas com sucesso
+                    if inicio == 0 and len(batch_processed) <= 3:
+                        logging.info(f"DEBUG - Registro {len(batch_processed)} processado:")
+                        logging.info(f"  Vigência: {registro['vigencia']}")
+                        logging.info(f"  Status: {registro['status']}")
+                        logging.info(f"  Proposta: {registro['proposta']}")
+                        logging.info(f"  Corretor: {registro['corretor'][:50]}...")
+                        logging.info(f"  Modalidade: {registro['modalidade']}")
+                        logging.info(f"  Operadora: {registro['operadora']}")
+                        logging.info(f"  Qtd Vidas: {registro['qtd_vidas']}")
+                        logging.info(f"  Tipo Corretor: {registro['tipo_corretor']}")
+                        logging.info(f"  Valor Comissão: {registro['valor_comissao']}")
+                        logging.info(f"  Vencimento: {registro['vencimento']}")
+                else:
+                    logging.warning(f"Linha {inicio + row_index + 1} rejeitada - dados essenciais faltando")
+                    
+            except Exception as row_error:
+                logging.error(f"Erro ao processar linha {inicio + row_index + 1}: {str(row_error)}")
+                erros.append(f"Linha {inicio + row_index + 1}: {str(row_error)}")
+                continue
+        
+        return batch_processed, erros
+
+    def linhas_do_relatorio(self):
+        """Linhas do relatório aberto no navegador, lidas em lotes sob demanda; só as que começam com uma data"""
+        return ExtratorTabela(
+            self.driver,
+            filtro_js="texto(row.cells[0]) !== '' && texto(row.cells[0]).includes('/')",
+            colunas=self.esquema.colunas
+        ).linhas()
+
+    def transformar_relatorio(self, raw_data=None):
+        """Com SIXVOX_TRANSFORMACAO_PROCESSOS, relatórios grandes são transformados em processos, num lote só"""
+        if self.processos_transformacao <= 1:
+            return self.transformar_lotes(raw_data)
+        
+        raw_data = list(self.linhas_do_relatorio() if raw_data is None else raw_data)
+        # Transformação em processos só compensa a partir de alguns milhares de linhas
+        if len(raw_data) < self.minimo_linhas_paralelo:
+            return self.transformar_lotes(raw_data)
+        
+        registros, erros = transformar_em_paralelo(
+            partial(processar_lote_em_processo, self.transformacao_vetorizada), raw_data,
+            trabalhadores=self.processos_transformacao
+        )
+        for numero_bloco, mensagens in erros.items():
+            logging.error(f"Bloco {numero_bloco + 1}: {len(mensagens)} linhas com erro, primeira: {mensagens[0]}")
+        return [registros]
+
+@lru_cache(maxsize=None)
+def esquema_de_transformacao():
+    """Esquema de comissões montado uma vez por processo, sem scraper (Supabase, sessão ou Chrome)"""
+    return SixvoxComissaoScraper.montar_esquema()
+
+
+def processar_lote_em_processo(transformacao_vetorizada, bloco, inicio=0):
+    """processar_lote para o pool de processos: só a opção de transformação vai para o trabalhador"""
+    return SixvoxComissaoScraper.processar_linhas(esquema_de_transformacao(), transformacao_vetorizada, bloco, inicio)
+
 
 if __name__ == "__main__":
     try:
         scraper = SixvoxComissaoScraper()
-        success = scraper.executar_scraping_comissoes()
+        success = scraper.executar_scraping()
         if not success:
             raise Exception("Falha na execução do scraping de comissões")
     except Exception as e:
@@ -0,0 +1,18 @@
+import logging
+
+from sessao_sixvox import SessaoSixvox
+from automacao_completa import executar_comissoes_em_leque
+
+
+if __name__ == "__main__":
+    # Execução agendada das comissões: o relatório é gerado uma vez para dimensao_comissao e comissoes,
+    # no lugar de automacao_comissao.py e automacao_comissao_2.py gerando o mesmo relatório cada um
+    try:
+        with SessaoSixvox() as sessao:
+            resultados = executar_comissoes_em_leque(sessao)
+        falhas = [nome for nome, sucesso in resultados.items() if not sucesso]
+        if falhas:
+            raise Exception(f"Falha na carga de {', '.join(falhas)}")
+    except Exception as e:
+        logging.error(f"Erro na execução principal: {str(e)}")
+        exit(1)
@@ -0,0 +1,173 @@
+from concurrent.futures import ThreadPoolExecutor
+from selenium.webdriver.common.by import By
+import logging
+import os
+
+from relatorios_concorrentes import ExecutorRelatoriosConcorrentes, TarefaRelatorio
+from sessao_sixvox import SessaoSixvox
+from automacao import SixvoxScraper as SixvoxVendasScraper
+from automacao_comissao import SixvoxScraper as SixvoxDimensaoComissaoScraper
+from automacao_comissao_2 import SixvoxComissaoScraper
+from automacao_corretor import SixvoxCorretorScraper
+
+
+LOCALIZADOR_RELATORIO = (By.XPATH, "//tr[@class='Freezing']")
+
+
+def carregar_em_leque(linhas, destinos):
+    """Carrega as mesmas linhas do relatório em cada destino ao mesmo tempo; retorna {nome: sucesso}
+
+    `destinos` são pares (nome, scraper); cada scraper aplica o próprio esquema e grava na própria tabela.
+    """
+    def carregar(nome, scraper):
+        try:
+            return scraper.carregar_relatorio(linhas)
+        except Exception as e:
+            logging.error(f"Erro ao carregar {nome}: {str(e)}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=len(destinos)) as executor:
+        futuros = {nome: executor.submit(carregar, nome, scraper) for nome, scraper in destinos}
+    return {nome: futuro.result() for nome, futuro in futuros.items()}
+
+
+def carregar_comissoes_em_leque(linhas, dimensao, comissoes):
+    """Alimenta dimensao_comissao e comissoes com uma única leitura do relatório de comissões"""
+    # Lidas pelo scraper de comissões: as colunas cobrem as de dimensao_comissao, nas mesmas posições
+    linhas = list(linhas)
+    logging.info(f"{len(linhas)} linhas do relatório de comissões lidas uma vez para dimensao_comissao e comissoes")
+    return carregar_em_leque(linhas, [("dimensao_comissao", dimensao), ("comissoes", comissoes)])
+
+
+def executar_comissoes_em_leque(sessao):
+    """Gera o relatório de comissões uma vez e carrega as duas tabelas; retorna {nome: sucesso}"""
+    dimensao = SixvoxDimensaoComissaoScraper(sessao=sessao)
+    comissoes = SixvoxComissaoScraper(sessao=sessao)
+    try:
+        if comissoes.modo_http:
+            linhas = comissoes.buscar_relatorio_http()
+        else:
+            if not comissoes.login():
+                raise Exception("Falha no login")
+            if not comissoes.navegar_para_relatorio():
+                raise Exception("Falha na navegação para o relatório de comissões")
+            linhas = comissoes.linhas_do_relatorio()
+        return carregar_comissoes_em_leque(linhas, dimensao, comissoes)
+    finally:
+        for scraper in (dimensao, comissoes):
+            scraper.esquema.registrar_estatisticas_cache()
+
+
+def executar_relatorios_concorrentes(sessao):
+    """Gera vendas e o relatório de comissões ao mesmo tempo, cada um no seu Chrome e na sua sessão do servidor.
+
+    vendas usa a sessão compartilhada; o relatório de comissões ganha um login próprio. Ele é gerado uma vez só e
+    alimenta dimensao_comissao e comissoes.
+    """
+    with sessao.sessao_independente() as sessao_comissoes:
+        if not sessao_comissoes.login():
+            raise Exception("Falha no login da sessão do relatório de comissões")
+
+        vendas = SixvoxVendasScraper(sessao=sessao)
+        dimensao = SixvoxDimensaoComissaoScraper(sessao=sessao_comissoes)
+        comissoes = SixvoxComissaoScraper(sessao=sessao_comissoes)
+        for scraper in (vendas, dimensao, comissoes):
+            scraper.driver = scraper.sessao.driver
+
+        leque = {}
+
+        def processar_leque():
+            leque.update(carregar_comissoes_em_leque(comissoes.linhas_do_relatorio(), dimensao, comissoes))
+            return all(leque.values())
+
+        tarefas = [
+            TarefaRelatorio(
+                "vendas", sessao, lambda: vendas.navegar_para_relatorio(aguardar=False), LOCALIZADOR_RELATORIO,
+                vendas.carregar_relatorio
+            ),
+            TarefaRelatorio(
+                "comissoes", sessao_comissoes, lambda: comissoes.navegar_para_relatorio(aguardar=False),
+                LOCALIZADOR_RELATORIO, processar_leque
+            ),
+        ]
+        resultados = ExecutorRelatoriosConcorrentes().executar(tarefas)
+
+    # Um relatório, duas tabelas: cada uma com o próprio resultado (falso se a leitura nem chegou a acontecer)
+    resultados['dimensao_comissao'] = leque.get('dimensao_comissao', False)
+    resultados['comissoes'] = leque.get('comissoes', False)
+    for scraper in (vendas, dimensao, comissoes):
+        scraper.esquema.registrar_estatisticas_cache()
+    return resultados
+
+
+def executar_automacoes(sessao, concorrente=False, em_leque=False):
+    """Executa os quatro scrapers reaproveitando o mesmo Chrome logado; relatórios em sessões paralelas se `concorrente`.
+
+    Com `em_leque` (e sempre no modo concorrente), dimensao_comissao e comissoes saem de uma única geração do
+    relatório de comissões.
+    """
+    etapas = [
+        ("vendas", SixvoxVendasScraper, "executar_scraping"),
+        ("dimensao_comissao", SixvoxDimensaoComissaoScraper, "executar_scraping"),
+        ("comissoes", SixvoxComissaoScraper, "executar_scraping"),
+        ("corretores", SixvoxCorretorScraper, "executar_scraping_corretores"),
+    ]
+
+    falhas = []
+    if concorrente:
+        try:
+            resultados = executar_relatorios_concorrentes(sessao)
+        except Exception as e:
+            logging.error(f"Erro ao executar relatórios concorrentes: {str(e)}")
+            resultados = {}
+        falhas.extend(nome for nome, _, _ in etapas[:3] if not resultados.get(nome))
+        etapas = etapas[3:]
+        # Volta à página inicial para a navegação sequencial seguinte
+        sessao.voltar_para_inicio()
+    elif em_leque:
+        logging.info("Iniciando etapas dimensao_comissao e comissoes em leque na sessão compartilhada...")
+        try:
+            resultados = executar_comissoes_em_leque(sessao)
+        except Exception as e:
+            logging.error(f"Erro ao executar comissões em leque: {str(e)}")
+            resultados = {}
+        falhas.extend(nome for nome in ("dimensao_comissao", "comissoes") if not resultados.get(nome))
+        etapas = [etapa for etapa in etapas if etapa[0] not in ("dimensao_comissao", "comissoes")]
+
+    for nome, classe_scraper, metodo in etapas:
+        logging.info(f"Iniciando etapa {nome} na sessão compartilhada...")
+        try:
+            scraper = classe_scraper(sessao=sessao)
+            sucesso = getattr(scraper, metodo)()
+        except Exception as e:
+            logging.error(f"Erro ao executar etapa {nome}: {str(e)}")
+            sucesso = False
+
+        if not sucesso:
+            falhas.append(nome)
+
+    if falhas:
+        logging.error(f"Etapas com falha: {', '.join(falhas)}")
+        return False
+
+    logging.info("Todas as etapas concluídas com sucesso!")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        with SessaoSixvox() as sessao:
+            if not sessao.login():
+                raise Exception("Falha no login")
+            # SIXVOX_CONCORRENTE=1 gera os relatórios em paralelo, cada um com o próprio login
+            # SIXVOX_COMISSOES_EM_LEQUE=1 gera o relatório de comissões uma vez para dimensao_comissao e comissoes
+            success = executar_automacoes(
+                sessao,
+                concorrente=os.environ.get('SIXVOX_CONCORRENTE', '') == '1',
+                em_leque=os.environ.get('SIXVOX_COMISSOES_EM_LEQUE', '') == '1'
+            )
+        if not success:
+            raise Exception("Falha na execução das automações")
+    except Exception as e:
+        logging.error(f"Erro na execução principal: {str(e)}")
+        exit(1)
@@ -1,19 +1,53 @@
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
 import time
 import logging
 import os
 import re
 from typing import Optional
 
+from conversores import data_brasileira
+from esperas import EsperaAdaptativa
+from esquema import Campo, Esquema, memorizar
+from extracao import ExtratorTabela
+from sessao_sixvox import SessaoSixvox
+from sincronizacao import ler_tabela, projecao_texto
+
+# Valor entre parênteses, ex.: 'HAPVIDA CLINIPAM (266)' -> '266'
+PADRAO_SKU = re.compile(r'\((.*?)\)')
+
+# Campos de corretor_bd mantidos pelo relatório de corretores
+COLUNAS_CORRETOR_BD = ['sku_corretor', 'nome_corretor', 'grade', 'equipe', 'sku_equipe', 'supervisor']
+
+# Atualização em lote de corretor_bd, a ser criada no banco (SQL editor do Supabase):
+#
+#   create or replace function atualizar_corretores(corretores jsonb)
+#   returns table (encontrados bigint, alterados bigint, nao_encontrados jsonb)
+#   language sql as $$
+#     with entrada as (
+#       select e.*, exists (select 1 from corretor_bd c where c.sku_corretor = e.sku_corretor) as encontrado
+#         from jsonb_to_recordset(corretores) as e(
+#           sku_corretor bigint, nome_corretor text, grade text, equipe text, sku_equipe bigint, supervisor text)
+#     ), alterados as (
+#       update corretor_bd c
+#          set nome_corretor = e.nome_corretor, grade = e.grade, equipe = e.equipe,
+#              sku_equipe = e.sku_equipe, supervisor = e.supervisor
+#         from entrada e
+#        where c.sku_corretor = e.sku_corretor
+#          and (c.nome_corretor, c.grade, c.equipe, c.sku_equipe, c.supervisor)
+#              is distinct from (e.nome_corretor, e.grade, e.equipe, e.sku_equipe, e.supervisor)
+#       returning c.sku_corretor
+#     )
+#     select (select count(*) from entrada where encontrado),
+#            (select count(*) from alterados),
+#            (select coalesce(jsonb_agg(sku_corretor), '[]'::jsonb) from entrada where not encontrado);
+#   $$;
+
 class SixvoxCorretorScraper:
-    def __init__(self):
+    def __init__(self, sessao: Optional[SessaoSixvox] = None):
         # Obtém as credenciais das variáveis de ambiente
         self.supabase_url: str = os.environ.get('SUPABASE_URL', '')
         self.supabase_key: str = os.environ.get('SUPABASE_KEY_ROLESECRET', '')
@@ -24,6 +58,9 @@ class SixvoxCorretorScraper:
             raise ValueError("Variáveis de ambiente necessárias não encontradas")
             
         self.driver: Optional[webdriver.Chrome] = None
+        # Sessão compartilhada quando informada; caso contrário cada scraper abre a sua
+        self.sessao = sessao or SessaoSixvox(self.login_email, self.login_senha)
+        self._sessao_propria = sessao is None
         # Inicializando o cliente Supabase com type hints
         self.supabase: Client = create_client(
             supabase_url=self.supabase_url,
@@ -35,47 +72,23 @@ class SixvoxCorretorScraper:
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
-    
-    def setup_driver(self):
-        chrome_options = Options()
-        chrome_options.add_argument('--headless=new')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
         
-        service = Service()
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        logging.info("Driver do Chrome inicializado com sucesso")
+        self.esquema = self.montar_esquema()
     
     def login(self):
-        try:
-            self.setup_driver()
-            self.driver.get("http://vhseguro.sixvox.com.br/")
-            
-            # Espera o campo de email estar disponível
-            email = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="email"]'))
-            )
-            email.send_keys(self.login_email)
-            
-            # Preenche a senha
-            password = self.driver.find_element(By.XPATH, '//*[@id="xenha"]')
-            password.send_keys(self.login_senha)
-            
-            # Clica no botão de login
-            login_button = self.driver.find_element(By.XPATH, '//*[@id="enviar"]')
-            login_button.click()
-            logging.info("Login realizado com sucesso!")
-            return True
-        except Exception as e:
-            logging.error(f"Erro durante o login: {str(e)}")
+        if not self.sessao.login():
             return False
+        self.driver = self.sessao.driver
+        return True
 
     def converter_data(self, data_str):
         """Converte string de data para formato DD/MM/YYYY"""
         if not data_str or data_str.strip() == '':
             return None
+        # Caminho rápido para o DD/MM/YYYY canônico; os demais formatos seguem pelo strptime
+        convertida = data_brasileira(data_str)
+        if convertida is not None:
+            return convertida
         try:
             data = datetime.strptime(data_str.strip(), '%d/%m/%Y')
             return data.strftime('%d/%m/%Y')
@@ -86,9 +99,30 @@ class SixvoxCorretorScraper:
         """Extrai o valor entre parênteses de um texto"""
         if not texto:
             return None
-        match = re.search(r'\((.*?)\)', texto)
+        match = PADRAO_SKU.search(texto)
         return match.group(1) if match else None
 
+    def remover_codigo(self, texto):
+        """Nome sem o código entre parênteses, ex.: 'Fulano (123)' -> 'Fulano'"""
+        return texto.split(' (')[0] if ' (' in texto else texto
+
+    def montar_esquema(self):
+        """Mapeamento coluna -> campo dos corretores; row[0] e row[3] não são usadas"""
+        # Equipes e datas de entrada se repetem entre os corretores: conversões memorizadas
+        extrair_sku = memorizar(self.extrair_sku)
+        converter_data = memorizar(self.converter_data, 1024)
+        remover_codigo = memorizar(self.remover_codigo)
+
+        return Esquema([
+            Campo('codigo', 1, extrair_sku),  # Código entre parênteses
+            Campo('nome_corretor', 2, remover_codigo, ''),
+            Campo('tipo', 4, padrao=''),
+            Campo('nome_equipe', 5, remover_codigo, ''),
+            Campo('equipe_completa', 5, padrao=''),  # FORMATO ORIGINAL COMPLETO
+            Campo('codigo_equipe', 5, extrair_sku),
+            Campo('data_entrada', 6, converter_data),
+        ])
+
     def navegar_para_corretores(self):
         try:
             actions = [
@@ -97,11 +131,9 @@ class SixvoxCorretorScraper:
                 ('//*[@id="sub_manual"]/a[1]', "click", "Submenu Corretor"),
             ]
             
+            espera = EsperaAdaptativa(self.driver, timeout_padrao=20)
             for xpath, action_type, description in actions:
-                time.sleep(2)
-                element = WebDriverWait(self.driver, 20).until(
-                    EC.element_to_be_clickable((By.XPATH, xpath))
-                )
+                element = espera.elemento((By.XPATH, xpath), description)
                 
                 if action_type == "click":
                     element.click()
@@ -109,14 +141,12 @@ class SixvoxCorretorScraper:
                     self.driver.execute_script("arguments[0].click();", element)
                     
                 logging.info(f"Ação realizada: {description}")
+                espera.dom_estavel(f"{description} estabilizado")
             
             logging.info("Aguardando carregamento da página de corretores...")
-            time.sleep(5)
             
             # Verificar se a tabela foi carregada
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.XPATH, "//table[@id='gv']"))
-            )
+            espera.relatorio((By.XPATH, "//table[@id='gv']"), "Tabela de corretores", timeout=60)
             logging.info("Tabela de corretores carregada com sucesso!")
             
             return True
@@ -129,47 +159,14 @@ class SixvoxCorretorScraper:
         try:
             logging.info("Iniciando extração dos dados de corretores...")
             
-            script_extracao = """
-                const rows = Array.from(document.querySelectorAll('table[id="gv"] tr')).filter(row => 
-                    !row.classList.contains('Freezing') && row.cells.length > 0);
-                return rows.map(row => Array.from(row.cells).map(cell => cell.innerText.trim()));
-            """
-            
-            raw_data = self.driver.execute_script(script_extracao)
+            raw_data = ExtratorTabela(self.driver, seletor_linhas='table[id="gv"] tr', colunas=self.esquema.colunas).linhas()
             dados = []
             
-            logging.info(f"Processando {len(raw_data)} registros de corretores...")
+            logging.info("Processando registros de corretores...")
             
             for row in raw_data:
                 if len(row) >= 6:  # Garantir que a linha tem células suficientes
-                    # Extrair o código entre parênteses
-                    codigo_completo = row[1] if len(row) > 1 else ''
-                    codigo = self.extrair_sku(codigo_completo)
-                    
-                    # Extrair o tipo
-                    tipo = row[4] if len(row) > 4 else ''
-                    
-                    # Extrair a equipe e o código da equipe
-                    equipe_completa = row[5] if len(row) > 5 else ''
-                    nome_equipe = equipe_completa.split(' (')[0] if ' (' in equipe_completa else equipe_completa
-                    codigo_equipe = self.extrair_sku(equipe_completa)
-                    
-                    # Extrair data de entrada
-                    data_entrada = self.converter_data(row[6]) if len(row) > 6 else None
-                    
-                    # Extrair corretor 
-                    corretor_completo = row[2] if len(row) > 2 else ''
-                    nome_corretor = corretor_completo.split(' (')[0] if ' (' in corretor_completo else corretor_completo
-                    
-                    registro = {
-                        'codigo': codigo,
-                        'nome_corretor': nome_corretor,
-                        'tipo': tipo,
-                        'nome_equipe': nome_equipe,
-                        'equipe_completa': equipe_completa,  # FORMATO ORIGINAL COMPLETO
-                        'codigo_equipe': codigo_equipe,
-                        'data_entrada': data_entrada
-                    }
+                    registro = self.esquema.converter(row)
                     
                     dados.append(registro)
             
@@ -184,70 +181,136 @@ class SixvoxCorretorScraper:
             logging.error(f"Erro ao extrair dados da tabela de corretores: {str(e)}")
             return []
 
+    def preparar_atualizacoes(self, dados):
+        """Linhas de atualização de corretor_bd por sku_corretor; retorna (linhas, quantidade de erros)"""
+        atualizacoes = {}
+        erros = 0
+        for corretor in dados:
+            try:
+                # Converter o código para int para match com sku_corretor
+                sku_corretor = int(corretor['codigo']) if corretor['codigo'] else None
+                
+                if sku_corretor is None:
+                    logging.warning(f"Corretor sem código válido: {corretor['nome_corretor']}")
+                    erros += 1
+                    continue
+                
+                # Converter codigo_equipe para int também
+                sku_equipe = int(corretor['codigo_equipe']) if corretor['codigo_equipe'] else None
+                
+                # Código repetido: vale a última linha, como nos UPDATEs em sequência
+                atualizacoes[sku_corretor] = {
+                    'sku_corretor': sku_corretor,
+                    'nome_corretor': corretor['nome_corretor'],
+                    'grade': corretor['tipo'],
+                    'equipe': corretor['equipe_completa'],
+                    'sku_equipe': sku_equipe,
+                    'supervisor': corretor['equipe_completa']  # FORMATO ORIGINAL COMPLETO COM CÓDIGO
+                }
+            except ValueError as ve:
+                logging.error(f"Erro de conversão para corretor {corretor['nome_corretor']}: {str(ve)}")
+                erros += 1
+        return list(atualizacoes.values()), erros
+
+    def atualizar_em_lote(self, atualizacoes, batch_size=2000):
+        """Atualiza corretor_bd com a função atualizar_corretores (SQL no topo do módulo), um lote por chamada.
+
+        Retorna (encontrados, alterados, SKUs não encontrados), contados pelo próprio banco.
+        """
+        encontrados = 0
+        alterados = 0
+        nao_encontrados = []
+        for i in range(0, len(atualizacoes), batch_size):
+            resultado = self.supabase.rpc(
+                'atualizar_corretores', {'corretores': atualizacoes[i:i+batch_size]}
+            ).execute().data[0]
+            encontrados += resultado['encontrados']
+            alterados += resultado['alterados']
+            nao_encontrados.extend(resultado['nao_encontrados'])
+            logging.info(
+                f"Lote {i//batch_size + 1}: {resultado['encontrados']} encontrados, {resultado['alterados']} alterados"
+            )
+        return encontrados, alterados, nao_encontrados
+
+    def atualizar_um_a_um(self, atualizacoes):
+        """Um UPDATE por corretor; usado enquanto a função atualizar_corretores não existe no banco"""
+        sucessos = 0
+        nao_encontrados = []
+        
+        batch_size = 50
+        for i in range(0, len(atualizacoes), batch_size):
+            logging.info(f"Processando lote {i//batch_size + 1} - corretores {i+1} a {min(i+batch_size, len(atualizacoes))}")
+            for dados_atualizacao in atualizacoes[i:i+batch_size]:
+                sku_corretor = dados_atualizacao['sku_corretor']
+                try:
+                    response = self.supabase.table('corretor_bd').update(
+                        {chave: valor for chave, valor in dados_atualizacao.items() if chave != 'sku_corretor'}
+                    ).eq('sku_corretor', sku_corretor).execute()
+                except Exception as e:
+                    logging.error(f"Erro ao atualizar corretor {dados_atualizacao['nome_corretor']}: {str(e)}")
+                    continue
+                
+                # Verificar se algum registro foi atualizado
+                if response.data and len(response.data) > 0:
+                    sucessos += 1
+                else:
+                    nao_encontrados.append(sku_corretor)
+            
+            # Pequena pausa entre lotes para não sobrecarregar o Supabase
+            time.sleep(1)
+        
+        # Só são enviados corretores com alteração, então cada UPDATE que casou é uma alteração
+        return sucessos, sucessos, nao_encontrados
+
+    def ler_corretores_bd(self):
+        """Projeção atual de corretor_bd (valores como texto) por sku_corretor, lida uma vez em páginas"""
+        return {
+            str(linha['sku_corretor']): projecao_texto(linha, COLUNAS_CORRETOR_BD)
+            for linha in ler_tabela(self.supabase, 'corretor_bd', COLUNAS_CORRETOR_BD, ordem='sku_corretor')
+        }
+
     def atualizar_corretores_no_supabase(self, dados):
         try:
             logging.info(f"Atualizando dados de {len(dados)} corretores no Supabase...")
             
-            sucessos = 0
-            erros = 0
-            nao_encontrados = 0
+            atualizacoes, erros = self.preparar_atualizacoes(dados)
             
-            batch_size = 50
-            for i in range(0, len(dados), batch_size):
-                batch = dados[i:i+batch_size]
-                logging.info(f"Processando lote {i//batch_size + 1} - corretores {i+1} a {min(i+batch_size, len(dados))}")
-                
-                for corretor in batch:
-                    try:
-                        # Converter o código para int para match com sku_corretor
-                        sku_corretor = int(corretor['codigo']) if corretor['codigo'] else None
-                        
-                        if sku_corretor is None:
-                            logging.warning(f"Corretor sem código válido: {corretor['nome_corretor']}")
-                            erros += 1
-                            continue
-                        
-                        # Converter codigo_equipe para int também
-                        sku_equipe = int(corretor['codigo_equipe']) if corretor['codigo_equipe'] else None
-                        
-                        # Preparar os dados para atualização - INCLUINDO SUPERVISOR
-                        dados_atualizacao = {
-                            'nome_corretor': corretor['nome_corretor'],
-                            'grade': corretor['tipo'],
-                            'equipe': corretor['equipe_completa'],
-                            'sku_equipe': sku_equipe,
-                            'supervisor': corretor['equipe_completa']  # FORMATO ORIGINAL COMPLETO COM CÓDIGO
-                        }
-                        
-                        # Fazer o UPDATE onde sku_corretor = codigo extraído
-                        response = self.supabase.table('corretor_bd').update(dados_atualizacao).eq('sku_corretor', sku_corretor).execute()
-                        
-                        # Verificar se algum registro foi atualizado
-                        if response.data and len(response.data) > 0:
-                            sucessos += 1
-                            if sucessos <= 5:  # Log das primeiras 5 atualizações para debug
-                                logging.info(f"Corretor atualizado - SKU: {sku_corretor}, Nome: {corretor['nome_corretor']}, Tipo: {corretor['tipo']}, Supervisor: {corretor['equipe_completa']}")
-                        else:
-                            nao_encontrados += 1
-                            if nao_encontrados <= 10:  # Log dos primeiros 10 não encontrados
-                                logging.warning(f"Corretor não encontrado na base - SKU: {sku_corretor}, Nome: {corretor['nome_corretor']}")
-                        
-                    except ValueError as ve:
-                        logging.error(f"Erro de conversão para corretor {corretor['nome_corretor']}: {str(ve)}")
-                        erros += 1
-                    except Exception as e:
-                        logging.error(f"Erro ao atualizar corretor {corretor['nome_corretor']}: {str(e)}")
-                        erros += 1
-                
-                # Pequena pausa entre lotes para não sobrecarregar o Supabase
-                time.sleep(1)
+            # Diferença calculada em memória: só vão para o banco os corretores com algum campo diferente.
+            # Os dois lados são comparados como texto, como na sincronização: o banco pode devolver números,
+            # datas ISO etc. num tipo diferente do que sai da conversão do relatório
+            atuais = self.ler_corretores_bd()
+            nao_encontrados = [atualizacao['sku_corretor'] for atualizacao in atualizacoes if str(atualizacao['sku_corretor']) not in atuais]
+            alteradas = [
+                atualizacao for atualizacao in atualizacoes
+                if str(atualizacao['sku_corretor']) in atuais
+                and projecao_texto(atualizacao, COLUNAS_CORRETOR_BD) != atuais[str(atualizacao['sku_corretor'])]
+            ]
+            logging.info(f"{len(atuais)} corretores na base, {len(alteradas)} com alterações a gravar")
+            
+            try:
+                _, alterados, sumidos = self.atualizar_em_lote(alteradas)
+            except APIError as e:
+                if e.code != 'PGRST202':
+                    raise
+                logging.warning("Função atualizar_corretores não encontrada no banco; atualizando um corretor por vez")
+                _, alterados, sumidos = self.atualizar_um_a_um(alteradas)
+            # Removidos da base entre a leitura e a gravação
+            nao_encontrados.extend(sumidos)
+            encontrados = len(atualizacoes) - len(nao_encontrados)
             
             logging.info(f"Resultado da atualização:")
-            logging.info(f"  - Sucessos: {sucessos}")
-            logging.info(f"  - Não encontrados: {nao_encontrados}")
+            logging.info(f"  - Encontrados: {encontrados}")
+            logging.info(f"  - Alterados: {alterados}")
+            logging.info(f"  - Sem alteração: {encontrados - alterados}")
+            logging.info(f"  - Não encontrados: {len(nao_encontrados)}")
             logging.info(f"  - Erros: {erros}")
+            if nao_encontrados:
+                skus = ', '.join(str(sku) for sku in sorted(nao_encontrados)[:50])
+                logging.warning(
+                    f"SKUs não encontrados em corretor_bd: {skus}{' ...' if len(nao_encontrados) > 50 else ''}"
+                )
             
-            return sucessos > 0
+            return encontrados > 0
             
         except Exception as e:
             logging.error(f"Erro geral ao atualizar dados de corretores: {str(e)}")
@@ -276,9 +339,9 @@ class SixvoxCorretorScraper:
             return False
                 
         finally:
-            if self.driver:
-                self.driver.quit()
-                logging.info("Driver do Chrome encerrado")
+            self.esquema.registrar_estatisticas_cache()
+            if self._sessao_propria:
+                self.sessao.encerrar()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,178 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import random
+import threading
+import time
+
+import httpx
+
+from registros import Registros, inserir_json
+
+# Respostas que garantem que o insert não foi aplicado; as demais (400, 409, 500, 504...) falham de imediato
+STATUS_TRANSITORIOS = {429, 503}
+
+# Falhas antes de a requisição sair: a conexão nem chegou a ser usada. Um timeout de leitura ou uma conexão
+# caída no meio da resposta não entram, porque o banco pode já ter gravado o lote
+ERROS_ANTES_DO_ENVIO = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class CarregadorSupabase:
+    """Insere registros em lotes concorrentes pela sessão HTTP/2 do cliente Supabase.
+
+    Os lotes compartilham a conexão multiplexada da sessão do postgrest, com no máximo `concorrencia`
+    requisições em andamento. O tamanho do lote é medido em linhas mas calibrado pelo que se observa:
+    cabe em `bytes_por_lote` e leva em torno de `latencia_alvo` segundos para gravar. Só se repetem, com
+    espera exponencial, os lotes que com certeza não foram gravados (falha de conexão ou 429/503); só depois
+    de `tentativas` falhas o lote é dado como perdido, e os demais seguem.
+
+    Inserts não são idempotentes: um lote que expirou na leitura pode ter sido gravado, então ele falha sem
+    nova tentativa em vez de arriscar linhas duplicadas.
+    """
+
+    def __init__(self, cliente, concorrencia=4, bytes_por_lote=1024 * 1024, latencia_alvo=2.0,
+                 linhas_iniciais=200, tentativas=4, espera_inicial=0.5):
+        self.cliente = cliente
+        self.concorrencia = concorrencia
+        self.bytes_por_lote = bytes_por_lote
+        self.latencia_alvo = latencia_alvo
+        self.linhas_iniciais = linhas_iniciais
+        self.tentativas = tentativas
+        self.espera_inicial = espera_inicial
+        # Tamanho calibrado por tabela, mantido entre chamadas (cargas em fluxo chamam inserir várias vezes)
+        self.linhas_por_lote = {}
+
+    def inserir(self, tabela, registros):
+        """Insere todos os registros na tabela; retorna o total inserido.
+
+        Levanta Exception se algum lote não puder ser gravado, depois de todos os lotes terem sido tentados.
+        """
+        if isinstance(registros, list):
+            registros = Registros(registros)
+        inicio = time.monotonic()
+        total = len(registros)
+        linhas_por_lote = self.linhas_por_lote.get(tabela, self.linhas_iniciais)
+        estado = threading.Lock()
+        vagas = threading.Semaphore(self.concorrencia)
+        gravados = 0
+        falhas = []
+
+        def enviar(posicao, fim, corpo):
+            nonlocal linhas_por_lote, gravados
+            try:
+                duracao = self._enviar_com_tentativas(tabela, registros.colunas, corpo)
+                linhas = fim - posicao
+                with estado:
+                    gravados += linhas
+                    # Calibra os próximos lotes pelo tamanho e pela latência deste, sem mudar mais que 2x de uma vez
+                    por_bytes = self.bytes_por_lote * linhas / len(corpo)
+                    por_latencia = linhas * self.latencia_alvo / max(duracao, 0.001)
+                    alvo = min(por_bytes, por_latencia)
+                    linhas_por_lote = max(1, int(min(max(alvo, linhas_por_lote / 2), linhas_por_lote * 2)))
+            except Exception as e:
+                logging.error(f"Lote {posicao + 1}-{fim} de {tabela} não gravado: {str(e)}")
+                with estado:
+                    falhas.append((posicao, fim))
+            finally:
+                vagas.release()
+
+        with ThreadPoolExecutor(max_workers=self.concorrencia) as executor:
+            posicao = 0
+            while posicao < total:
+                # Espera uma vaga antes de montar o lote, para usar o tamanho calibrado mais recente
+                vagas.acquire()
+                with estado:
+                    fim = min(posicao + linhas_por_lote, total)
+                corpo = registros.para_json(posicao, fim).encode('utf-8')
+                executor.submit(enviar, posicao, fim, corpo)
+                posicao = fim
+        self.linhas_por_lote[tabela] = linhas_por_lote
+
+        duracao = time.monotonic() - inicio
+        logging.info(
+            f"{gravados} de {total} registros inseridos em {tabela} em {duracao:.2f}s "
+            f"({self.concorrencia} conexões simultâneas, último lote calibrado em {linhas_por_lote} linhas)"
+        )
+        if falhas:
+            raise Exception(f"{len(falhas)} lotes de {tabela} não gravados ({total - gravados} registros)")
+        return gravados
+
+    def _enviar_com_tentativas(self, tabela, colunas, corpo):
+        """Envia o corpo, repetindo falhas transitórias; retorna a duração da tentativa bem-sucedida"""
+        for tentativa in range(1, self.tentativas + 1):
+            inicio = time.monotonic()
+            try:
+                inserir_json(self.cliente, tabela, colunas, corpo)
+                return time.monotonic() - inicio
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if isinstance(e, httpx.HTTPStatusError):
+                    transitorio = e.response.status_code in STATUS_TRANSITORIOS
+                else:
+                    transitorio = isinstance(e, ERROS_ANTES_DO_ENVIO)
+                if not transitorio or tentativa == self.tentativas:
+                    raise
+                motivo = str(e) if isinstance(e, httpx.TransportError) else f"HTTP {e.response.status_code}"
+                espera = self.espera_inicial * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5)
+                logging.warning(
+                    f"Falha ao inserir lote em {tabela} (tentativa {tentativa}/{self.tentativas}): {motivo}; "
+                    f"nova tentativa em {espera:.1f}s"
+                )
+                time.sleep(espera)
+
+
+if __name__ == "__main__":
+    # Benchmark contra um PostgREST simulado local (latência fixa por requisição + custo por byte, 5% de 503):
+    # lotes de 100 em sequência com pausa de 0,5s (formato atual de comissões) vs. carregador concorrente
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import json
+    from types import SimpleNamespace
+
+    recebidas = []
+    trava_recebidas = threading.Lock()
+
+    class PostgrestSimulado(BaseHTTPRequestHandler):
+        def do_POST(self):
+            corpo = self.rfile.read(int(self.headers['Content-Length']))
+            time.sleep(0.05 + len(corpo) / (20 * 1024 * 1024))
+            if random.random() < 0.05:
+                self.send_response(503)
+            else:
+                with trava_recebidas:
+                    recebidas.extend(json.loads(corpo))
+                self.send_response(201)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), PostgrestSimulado)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    cliente = SimpleNamespace(postgrest=SimpleNamespace(
+        session=httpx.Client(base_url=f"http://127.0.0.1:{servidor.server_port}", timeout=30)
+    ))
+    logging.basicConfig(level=logging.WARNING)
+    random.seed(7)
+
+    registros = Registros(
+        {'proposta': str(i), 'parcela': i % 12, 'corretor': f'Corretor {i % 300} ({i % 300})', 'valor_comissao': i / 7,
+         **{f'coluna_{n}': f'texto {n}' for n in range(25)}}
+        for i in range(20_000)
+    )
+
+    inicio = time.perf_counter()
+    for posicao in range(0, 2_000, 100):
+        try:
+            inserir_json(cliente, 'comissoes', registros.colunas, registros.para_json(posicao, posicao + 100).encode('utf-8'))
+        except httpx.HTTPStatusError:
+            pass
+        time.sleep(0.5)
+    duracao = time.perf_counter() - inicio
+    print(f"sequencial (100 por lote + 0,5s): {2_000 / duracao:,.0f} registros/s, medido em 2000 registros")
+
+    for concorrencia in (1, 4, 8):
+        recebidas.clear()
+        inicio = time.perf_counter()
+        CarregadorSupabase(cliente, concorrencia=concorrencia, espera_inicial=0.05).inserir('comissoes', registros)
+        duracao = time.perf_counter() - inicio
+        assert sorted(int(linha['proposta']) for linha in recebidas) == list(range(len(registros)))
+        print(f"carregador, {concorrencia} simultâneas: {len(registros) / duracao:,.0f} registros/s")
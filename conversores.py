@@ -0,0 +1,82 @@
+"""Parsers por fatias para as datas 'DD/MM/YYYY' que o Sixvox gera.
+
+As funções aceitam só o formato canônico (validado no calendário) e devolvem None para qualquer outra coisa;
+quem chama segue então pela conversão original, então a saída é idêntica. Valores 'R$ 1.234,56' e '100,00%'
+continuam pela cadeia de replace + float: um parser estrito equivalente mediu umas três vezes mais lento que
+ela, que roda em C.
+"""
+
+DIAS_NO_MES = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _partes_data(texto):
+    """(dia, mes, ano) de uma data DD/MM/YYYY válida no calendário; None para qualquer outra coisa"""
+    texto = texto.strip()
+    if len(texto) != 10 or texto[2] != '/' or texto[5] != '/' or not texto.isascii():
+        return None
+    dia, mes, ano = texto[:2], texto[3:5], texto[6:]
+    if not (dia.isdigit() and mes.isdigit() and ano.isdigit()):
+        return None
+
+    d, m, a = int(dia), int(mes), int(ano)
+    # Anos abaixo de 1000 ficam com o strftime, que não completa com zeros em todas as plataformas
+    if a < 1000 or not 1 <= m <= 12 or not 1 <= d <= DIAS_NO_MES[m]:
+        return None
+    if m == 2 and d == 29 and not (a % 4 == 0 and (a % 100 != 0 or a % 400 == 0)):
+        return None
+    return dia, mes, ano
+
+
+def data_brasileira(texto):
+    """'15/11/2015' -> '15/11/2015' (validada)"""
+    partes = _partes_data(texto)
+    return None if partes is None else '/'.join(partes)
+
+
+def data_iso(texto):
+    """'15/11/2015' -> '2015-11-15'"""
+    partes = _partes_data(texto)
+    return None if partes is None else f"{partes[2]}-{partes[1]}-{partes[0]}"
+
+
+if __name__ == "__main__":
+    # Benchmark com a distribuição típica das células: converter_data atual (strptime + strftime) vs. parser
+    # por fatias
+    import random
+    import time
+    from datetime import datetime
+
+    def converter(formato_saida):
+        def converter_data(data_str):
+            if not data_str or data_str.strip() == '':
+                return None
+            try:
+                return datetime.strptime(data_str.strip(), '%d/%m/%Y').strftime(formato_saida)
+            except ValueError:
+                return None
+        return converter_data
+
+    def com_fallback(rapido, atual):
+        def converter_data(data_str):
+            resultado = rapido(data_str)
+            return atual(data_str) if resultado is None else resultado
+        return converter_data
+
+    random.seed(42)
+    # Poucas centenas de datas distintas, algumas células vazias e formatos fora do padrão
+    datas = [
+        f"{random.randint(1, 28):02d}/{random.randint(1, 12):02d}/{random.randint(2015, 2025)}"
+        if random.random() < 0.95 else random.choice(['', ' ', '29/02/2024', '29/02/2023', '31/04/2024', '1/2/2024', ' 05/01/2024 '])
+        for _ in range(100_000)
+    ]
+
+    for nome, formato, rapido in (("DD/MM/YYYY", '%d/%m/%Y', data_brasileira), ("ISO", '%Y-%m-%d', data_iso)):
+        atual = converter(formato)
+        por_fatias = com_fallback(rapido, atual)
+        assert [atual(data) for data in datas] == [por_fatias(data) for data in datas], nome
+        for rotulo, funcao in (("strptime", atual), ("por fatias", por_fatias)):
+            inicio = time.perf_counter()
+            for data in datas:
+                funcao(data)
+            duracao = time.perf_counter() - inicio
+            print(f"data {nome} ({rotulo}): {len(datas) / duracao:,.0f} valores/s")
@@ -0,0 +1,109 @@
+"""Gravação por COPY direto no Postgres do Supabase, alternativa aos inserts JSON pelo PostgREST.
+
+Mesma interface do CarregadorSupabase (`inserir(tabela, registros)`), então serve para as tabelas
+principais e para as de preparação da troca atômica. Os valores saem direto das colunas de `Registros`
+para o COPY em formato texto, sem passar por dicts nem JSON; o Postgres converte cada valor com as
+mesmas funções de entrada que o PostgREST usa, então o conteúdo gravado é o mesmo.
+
+Usa a connection string do banco (Project Settings > Database no Supabase, de preferência a do pooler
+em modo sessão) em SIXVOX_POSTGRES_URL. O psycopg com o pool é opcional e fica fora do requirements.txt:
+instale com `pip install -r requirements-postgres.txt` onde SIXVOX_POSTGRES_URL for usada.
+
+Cada `inserir` é um único COPY numa transação, então uma carga que falha não deixa nada gravado. O pool
+não divide uma carga entre conexões: ele atende as cargas simultâneas dos scrapers do processo (leque de
+comissões, relatórios concorrentes), cada uma na sua conexão.
+"""
+import logging
+import threading
+import time
+
+try:
+    import psycopg
+    from psycopg import sql
+    from psycopg_pool import ConnectionPool
+except ImportError:  # dependência opcional: só necessária com SIXVOX_POSTGRES_URL
+    psycopg = None
+
+from registros import Registros
+
+# Um pool por banco, compartilhado pelos scrapers do mesmo processo
+_pools = {}
+_trava_pools = threading.Lock()
+
+
+def _pool(url, tamanho):
+    with _trava_pools:
+        pool = _pools.get(url)
+        if pool is None:
+            pool = _pools[url] = ConnectionPool(url, min_size=1, max_size=tamanho, open=True)
+        return pool
+
+
+class CarregadorCopy:
+    """Insere registros com COPY ... FROM STDIN, uma conexão do pool por carga"""
+
+    def __init__(self, url, tamanho_pool=4):
+        if psycopg is None:
+            raise ImportError("SIXVOX_POSTGRES_URL requer o pacote psycopg[binary,pool] (pip install -r requirements-postgres.txt)")
+        self.url = url
+        # Máximo de cargas simultâneas no banco; o primeiro carregador de cada URL define o tamanho do pool
+        self.tamanho_pool = tamanho_pool
+
+    def inserir(self, tabela, registros):
+        """Copia todos os registros para a tabela numa transação; retorna o total inserido"""
+        if isinstance(registros, list):
+            registros = Registros(registros)
+        inicio = time.monotonic()
+        comando = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(tabela), sql.SQL(', ').join(map(sql.Identifier, registros.colunas))
+        )
+        with _pool(self.url, self.tamanho_pool).connection() as conexao:
+            with conexao.cursor() as cursor:
+                with cursor.copy(comando) as copia:
+                    for linha in zip(*registros.colunas.values()):
+                        copia.write_row(linha)
+        logging.info(f"{len(registros)} registros copiados para {tabela} em {time.monotonic() - inicio:.2f}s")
+        return len(registros)
+
+
+if __name__ == "__main__":
+    # Benchmark contra um Postgres local (SIXVOX_POSTGRES_URL): COPY vs. insert do corpo JSON como o PostgREST
+    # faz (json_populate_recordset), com linhas no formato do relatório de comissões
+    import os
+
+    url = os.environ['SIXVOX_POSTGRES_URL']
+    registros = Registros(
+        {'proposta': str(i), 'parcela': i % 12, 'corretor': f'Corretor {i % 300} ({i % 300})', 'valor_comissao': i / 7,
+         'vigencia': '2024-11-15', **{f'coluna_{n}': f'texto {n}' for n in range(25)}}
+        for i in range(100_000)
+    )
+    definicao = ', '.join(
+        ['proposta text', 'parcela integer', 'corretor text', 'valor_comissao double precision', 'vigencia date']
+        + [f'coluna_{n} text' for n in range(25)]
+    )
+
+    with psycopg.connect(url, autocommit=True) as conexao:
+        conexao.execute("drop table if exists benchmark_copy, benchmark_json")
+        conexao.execute(f"create table benchmark_copy ({definicao})")
+        conexao.execute(f"create table benchmark_json ({definicao})")
+
+        inicio = time.perf_counter()
+        for posicao in range(0, len(registros), 1000):
+            conexao.execute(
+                "insert into benchmark_json select * from json_populate_recordset(null::benchmark_json, %s)",
+                (registros.para_json(posicao, posicao + 1000),)
+            )
+        duracao_json = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        CarregadorCopy(url).inserir('benchmark_copy', registros)
+        duracao_copy = time.perf_counter() - inicio
+
+        iguais = conexao.execute(
+            "select count(*) from (select * from benchmark_copy except all select * from benchmark_json) diferenca"
+        ).fetchone()[0] == 0
+        conexao.execute("drop table benchmark_copy, benchmark_json")
+
+    print(f"JSON (lotes de 1000): {len(registros) / duracao_json:,.0f} registros/s")
+    print(f"COPY: {len(registros) / duracao_copy:,.0f} registros/s")
+    print(f"conteúdo idêntico: {iguais}")
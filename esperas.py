@@ -0,0 +1,114 @@
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+import logging
+import time
+
+# Resolve quando o documento passa `quietude_ms` sem nenhuma mutação, ou falha após `limite_ms`
+SCRIPT_DOM_ESTAVEL = """
+    const quietudeMs = arguments[0];
+    const limiteMs = arguments[1];
+    const concluir = arguments[arguments.length - 1];
+    let temporizador = null;
+    let limite = null;
+    const observador = new MutationObserver(() => {
+        clearTimeout(temporizador);
+        temporizador = setTimeout(() => finalizar(true), quietudeMs);
+    });
+    function finalizar(estavel) {
+        observador.disconnect();
+        clearTimeout(temporizador);
+        clearTimeout(limite);
+        concluir(estavel);
+    }
+    observador.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    temporizador = setTimeout(() => finalizar(true), quietudeMs);
+    limite = setTimeout(() => finalizar(false), limiteMs);
+"""
+
+# Quantidade de recursos já baixados pela página; estável + readyState completo = rede ociosa
+SCRIPT_ESTADO_REDE = """
+    return [document.readyState, performance.getEntriesByType('resource').length];
+"""
+
+
+class EsperaAdaptativa:
+    """Esperas orientadas a eventos que terminam assim que a página está pronta e registram quanto duraram"""
+
+    def __init__(self, driver, timeout_padrao: float = 30):
+        self.driver = driver
+        self.timeout_padrao = timeout_padrao
+
+    def _registrar(self, descricao, inicio):
+        duracao = time.monotonic() - inicio
+        logging.info(f"Espera '{descricao}' resolvida em {duracao:.2f}s")
+        return duracao
+
+    def elemento(self, localizador, descricao, timeout=None, condicao=EC.element_to_be_clickable):
+        """Aguarda o elemento satisfazer a condição (clicável por padrão) e o retorna"""
+        inicio = time.monotonic()
+        elemento = WebDriverWait(self.driver, timeout or self.timeout_padrao).until(condicao(localizador))
+        self._registrar(descricao, inicio)
+        return elemento
+
+    def documento_carregado(self, timeout=None):
+        WebDriverWait(self.driver, timeout or self.timeout_padrao).until(
+            lambda driver: driver.execute_script("return document.readyState") == 'complete'
+        )
+
+    def dom_estavel(self, descricao, quietude=0.3, timeout=None):
+        """Aguarda o DOM ficar `quietude` segundos sem mutações, tolerando navegações no meio do caminho"""
+        timeout = timeout or self.timeout_padrao
+        inicio = time.monotonic()
+        prazo = inicio + timeout
+
+        while time.monotonic() < prazo:
+            restante = prazo - time.monotonic()
+            try:
+                self.documento_carregado(timeout=restante)
+                self.driver.set_script_timeout(restante + 1)
+                if self.driver.execute_async_script(SCRIPT_DOM_ESTAVEL, int(quietude * 1000), int(restante * 1000)):
+                    self._registrar(descricao, inicio)
+                    return True
+            except TimeoutException:
+                break
+            except WebDriverException:
+                # A página foi descarregada durante a observação; observa o novo documento
+                continue
+
+        logging.warning(f"Espera '{descricao}' sem DOM estável após {time.monotonic() - inicio:.2f}s")
+        return False
+
+    def rede_ociosa(self, descricao, janela=0.5, timeout=None, intervalo=0.1):
+        """Aguarda o documento completo e nenhum recurso novo baixado durante `janela` segundos"""
+        timeout = timeout or self.timeout_padrao
+        inicio = time.monotonic()
+        prazo = inicio + timeout
+        ultimo_total = None
+        estavel_desde = None
+
+        while time.monotonic() < prazo:
+            try:
+                estado, total = self.driver.execute_script(SCRIPT_ESTADO_REDE)
+            except WebDriverException:
+                estado, total = None, None
+
+            agora = time.monotonic()
+            if estado == 'complete' and total == ultimo_total:
+                if estavel_desde is None:
+                    estavel_desde = agora
+                elif agora - estavel_desde >= janela:
+                    self._registrar(descricao, inicio)
+                    return True
+            else:
+                estavel_desde = None
+            ultimo_total = total
+            time.sleep(intervalo)
+
+        logging.warning(f"Espera '{descricao}' sem rede ociosa após {time.monotonic() - inicio:.2f}s")
+        return False
+
+    def relatorio(self, localizador, descricao, timeout=120):
+        """Aguarda o cabeçalho do relatório e o fim do carregamento da página, sem espera fixa"""
+        self.elemento(localizador, descricao, timeout=timeout, condicao=EC.presence_of_element_located)
+        return self.rede_ociosa(f"{descricao} (rede ociosa)", timeout=timeout)
@@ -0,0 +1,143 @@
+from functools import lru_cache
+from typing import Any, Callable, NamedTuple, Optional
+import logging
+import time
+
+
+def memorizar(conversor, tamanho=4096):
+    """Conversor com cache LRU limitado: as mesmas datas, operadoras e corretores se repetem milhares de vezes.
+
+    Só serve para conversores puros de str; `cache_info()` traz os acertos para o relatório do fim da execução.
+    """
+    return lru_cache(maxsize=tamanho)(conversor)
+
+
+class Campo(NamedTuple):
+    """Um campo do registro: coluna de origem, conversor opcional e valor quando a coluna não existe.
+
+    `vetorizado` é o equivalente do conversor para uma coluna inteira (ver transformacao_vetorizada).
+    """
+    nome: str
+    coluna: Optional[int]
+    conversor: Optional[Callable[[str], Any]] = None
+    padrao: Any = None
+    vetorizado: Optional[Callable] = None
+
+
+class Esquema:
+    """Mapeamento declarativo linha -> registro, compilado uma vez por quantidade de colunas.
+
+    O conversor gerado para cada formato de linha já sabe quais colunas existem, então não repete a
+    verificação `len(row) > n` campo a campo: colunas ausentes viram constantes com o valor padrão.
+    """
+
+    def __init__(self, campos):
+        self.campos = list(campos)
+        self.colunas = sorted({campo.coluna for campo in self.campos if campo.coluna is not None})
+        self._compilados = {}
+
+    def compilar(self, n_colunas):
+        conversor = self._compilados.get(n_colunas)
+        if conversor is not None:
+            return conversor
+
+        namespace = {}
+        itens = []
+        for indice, campo in enumerate(self.campos):
+            if campo.coluna is not None and campo.coluna < n_colunas:
+                expressao = f"row[{campo.coluna}]"
+                if campo.conversor is not None:
+                    namespace[f"_conversor_{indice}"] = campo.conversor
+                    expressao = f"_conversor_{indice}({expressao})"
+            else:
+                namespace[f"_padrao_{indice}"] = campo.padrao
+                expressao = f"_padrao_{indice}"
+            itens.append(f"{campo.nome!r}: {expressao}")
+
+        fonte = "def converter(row):\n    return {" + ", ".join(itens) + "}\n"
+        exec(fonte, namespace)
+        conversor = self._compilados[n_colunas] = namespace['converter']
+        return conversor
+
+    def converter(self, row):
+        return self.compilar(len(row))(row)
+
+    def registrar_estatisticas_cache(self):
+        """Loga acertos e ocupação do cache de cada conversor memorizado do esquema"""
+        vistos = set()
+        for campo in self.campos:
+            conversor = campo.conversor
+            if not hasattr(conversor, 'cache_info') or id(conversor) in vistos:
+                continue
+            vistos.add(id(conversor))
+
+            info = conversor.cache_info()
+            consultas = info.hits + info.misses
+            if consultas:
+                logging.info(
+                    f"Cache {conversor.__name__}: {info.hits}/{consultas} acertos ({info.hits / consultas:.1%}), "
+                    f"{info.currsize}/{info.maxsize} valores"
+                )
+
+
+if __name__ == "__main__":
+    # Benchmark: dicionário montado à mão com `len(row) > n` por campo vs. conversor compilado (e memorizado)
+    import re
+    from datetime import datetime
+
+    def extrair_sku(texto):
+        if not texto:
+            return None
+        match = re.search(r'\((.*?)\)', texto)
+        return match.group(1) if match else None
+
+    def converter_data(data_str):
+        if not data_str or data_str.strip() == '':
+            return None
+        try:
+            return datetime.strptime(data_str.strip(), '%d/%m/%Y').strftime('%d/%m/%Y')
+        except ValueError:
+            return None
+
+    def manual(row):
+        return {
+            'corretor': row[2] if len(row) > 2 else '',
+            'sku_corretor': extrair_sku(row[2]) if len(row) > 2 else None,
+            'data_venda': converter_data(row[3]) if len(row) > 3 else None,
+            'operadora': row[6] if len(row) > 6 else '',
+            'sku_operadora': extrair_sku(row[6]) if len(row) > 6 else None,
+            **{f'coluna_{n}': row[n] if len(row) > n else '' for n in range(7, 29)},
+        }
+
+    esquema = Esquema([
+        Campo('corretor', 2, padrao=''),
+        Campo('sku_corretor', 2, extrair_sku),
+        Campo('data_venda', 3, converter_data),
+        Campo('operadora', 6, padrao=''),
+        Campo('sku_operadora', 6, extrair_sku),
+        *[Campo(f'coluna_{n}', n, padrao='') for n in range(7, 29)],
+    ])
+
+    linhas = [
+        ['', 'ADM (1)', f'Corretor {i % 300} ({i % 300})', f'{i % 28 + 1:02d}/03/2024', '', '', 'OPERADORA (266)']
+        + [f'valor {n}' for n in range(7, 29)]
+        for i in range(50_000)
+    ]
+    assert [manual(linha) for linha in linhas[:100]] == [esquema.converter(linha) for linha in linhas[:100]]
+
+    sku_memorizado = memorizar(extrair_sku)
+    data_memorizada = memorizar(converter_data, 1024)
+    memorizado = Esquema([
+        Campo(campo.nome, campo.coluna, {extrair_sku: sku_memorizado, converter_data: data_memorizada}.get(campo.conversor), campo.padrao)
+        for campo in esquema.campos
+    ])
+    assert [memorizado.converter(linha) for linha in linhas[:100]] == [esquema.converter(linha) for linha in linhas[:100]]
+
+    for nome, funcao in (
+        ("manual", manual), ("esquema compilado", esquema.converter), ("compilado + memorizado", memorizado.converter)
+    ):
+        inicio = time.perf_counter()
+        for linha in linhas:
+            funcao(linha)
+        duracao = time.perf_counter() - inicio
+        print(f"{nome}: {len(linhas) / duracao:,.0f} linhas/s")
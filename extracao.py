@@ -0,0 +1,70 @@
+from itertools import islice
+import logging
+import time
+
+# Separadores de controle ASCII que não aparecem no texto das células
+SEPARADOR_LINHA = '\x1e'
+SEPARADOR_CELULA = '\x1f'
+
+# Seleciona as linhas uma única vez e as guarda na página para a leitura em lotes
+SCRIPT_PREPARAR = """
+    const filtro = new Function('row', 'texto', 'return ' + arguments[1] + ';');
+    const texto = (cell) => cell.textContent.replace(/\\s+/g, ' ').trim();
+    window.__linhasSixvox = Array.from(document.querySelectorAll(arguments[0])).filter(row =>
+        !row.classList.contains('Freezing') && row.cells.length > 0 && filtro(row, texto)
+    );
+    return window.__linhasSixvox.length;
+"""
+
+# Devolve as linhas [inicio, fim) como uma única string delimitada, lendo textContent (não força layout).
+# Células fora da projeção (arguments[4]) vão vazias, preservando posições e quantidade de colunas
+SCRIPT_LOTE = """
+    const texto = (cell) => cell.textContent.replace(/\\s+/g, ' ').trim();
+    const colunas = arguments[4] === null ? null : new Set(arguments[4]);
+    const celula = colunas === null ? texto : (cell, indice) => colunas.has(indice) ? texto(cell) : '';
+    return window.__linhasSixvox.slice(arguments[0], arguments[1])
+        .map(row => Array.from(row.cells, celula).join(arguments[3]))
+        .join(arguments[2]);
+"""
+
+SCRIPT_LIMPAR = "delete window.__linhasSixvox;"
+
+
+def lotes(linhas, tamanho):
+    """Agrupa qualquer iterável de linhas em listas de até `tamanho` itens"""
+    iterador = iter(linhas)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+class ExtratorTabela:
+    """Lê a tabela do relatório em lotes compactos, entregando as linhas ao Python conforme chegam"""
+
+    def __init__(self, driver, seletor_linhas='tr', filtro_js='true', tamanho_lote=500, colunas=None):
+        self.driver = driver
+        self.seletor_linhas = seletor_linhas
+        self.filtro_js = filtro_js
+        # Índices das células que o mapeamento do scraper usa; None lê todas
+        self.colunas = sorted(colunas) if colunas is not None else None
+        self.tamanho_lote = tamanho_lote
+        self.total = 0
+
+    def linhas(self):
+        inicio = time.monotonic()
+        self.total = self.driver.execute_script(SCRIPT_PREPARAR, self.seletor_linhas, self.filtro_js)
+        logging.info(f"{self.total} linhas encontradas na tabela, extraindo em lotes de {self.tamanho_lote}...")
+
+        try:
+            for posicao in range(0, self.total, self.tamanho_lote):
+                bloco = self.driver.execute_script(
+                    SCRIPT_LOTE, posicao, posicao + self.tamanho_lote, SEPARADOR_LINHA, SEPARADOR_CELULA, self.colunas
+                )
+                for linha in bloco.split(SEPARADOR_LINHA):
+                    yield linha.split(SEPARADOR_CELULA)
+        finally:
+            self.driver.execute_script(SCRIPT_LIMPAR)
+
+        logging.info(f"Extração de {self.total} linhas do navegador concluída em {time.monotonic() - inicio:.2f}s")
@@ -0,0 +1,106 @@
+"""Impressão digital do relatório inteiro, para não transformar nem gravar de novo um relatório idêntico.
+
+A impressão cobre as células lidas (só as colunas que o esquema usa), na ordem em que chegam. Ela é
+guardada depois de cada carga bem-sucedida, num arquivo local ou, com SIXVOX_TABELA_IMPRESSOES, numa
+tabela de metadados que vale para qualquer máquina:
+
+    create table relatorios_impressoes (
+      relatorio text primary key,
+      impressao text not null,
+      ignoradas integer not null default 0,
+      atualizado_em timestamptz not null default now()
+    );
+
+`ignoradas` conta as execuções puladas desde que o relatório começou a ser acompanhado.
+"""
+from datetime import datetime, timezone
+import hashlib
+import json
+import logging
+import os
+import threading
+
+ARQUIVO_PADRAO = '.sixvox_impressoes.json'
+# Relatórios concorrentes (sessões paralelas) gravam no mesmo arquivo
+_trava_arquivo = threading.Lock()
+
+
+def impressao_linhas(linhas):
+    """Impressão estável das linhas do relatório (listas de textos)"""
+    resumo = hashlib.blake2b(digest_size=16)
+    for linha in linhas:
+        resumo.update(json.dumps(linha, ensure_ascii=False).encode('utf-8'))
+        resumo.update(b'\n')
+    return resumo.hexdigest()
+
+
+class ImpressoesRelatorio:
+    """Última impressão carregada de cada relatório, na tabela `tabela` (se informada) ou no arquivo local"""
+
+    def __init__(self, cliente=None, tabela='', arquivo=ARQUIVO_PADRAO):
+        self.cliente = cliente
+        self.tabela = tabela
+        self.arquivo = arquivo
+
+    def _ler(self, relatorio):
+        if self.tabela:
+            linhas = self.cliente.table(self.tabela).select('*').eq('relatorio', relatorio).execute().data
+            return linhas[0] if linhas else None
+        try:
+            with open(self.arquivo, encoding='utf-8') as arquivo:
+                return json.load(arquivo).get(relatorio)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _gravar(self, relatorio, impressao, ignoradas):
+        estado = {
+            'relatorio': relatorio,
+            'impressao': impressao,
+            'ignoradas': ignoradas,
+            'atualizado_em': datetime.now(timezone.utc).isoformat(),
+        }
+        if self.tabela:
+            self.cliente.table(self.tabela).upsert(estado).execute()
+            return
+        with _trava_arquivo:
+            try:
+                with open(self.arquivo, encoding='utf-8') as arquivo:
+                    todos = json.load(arquivo)
+            except (FileNotFoundError, json.JSONDecodeError):
+                todos = {}
+            todos[relatorio] = estado
+            # Grava num temporário e troca, para uma interrupção não deixar o arquivo pela metade
+            temporario = f"{self.arquivo}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump(todos, arquivo, indent=2)
+            os.replace(temporario, self.arquivo)
+
+    def inalterado(self, relatorio, impressao):
+        """True (e conta a execução pulada) se a impressão é a da última carga do relatório"""
+        try:
+            anterior = self._ler(relatorio)
+        except Exception as e:
+            logging.warning(f"Impressão anterior de {relatorio} indisponível, seguindo com a carga: {str(e)}")
+            return False
+        if not anterior or anterior['impressao'] != impressao:
+            return False
+
+        ignoradas = anterior.get('ignoradas', 0) + 1
+        try:
+            self._gravar(relatorio, impressao, ignoradas)
+        except Exception as e:
+            logging.warning(f"Erro ao contar execução pulada de {relatorio}: {str(e)}")
+        logging.info(
+            f"Relatório {relatorio} idêntico à última carga ({impressao}); transformação e gravação puladas "
+            f"({ignoradas} execuções puladas no total)"
+        )
+        return True
+
+    def registrar(self, relatorio, impressao):
+        """Guarda a impressão de um relatório que acabou de ser carregado com sucesso"""
+        try:
+            anterior = self._ler(relatorio)
+            self._gravar(relatorio, impressao, anterior.get('ignoradas', 0) if anterior else 0)
+        except Exception as e:
+            # Sem a impressão a próxima execução só deixa de pular; a carga já foi feita
+            logging.warning(f"Erro ao guardar a impressão de {relatorio}: {str(e)}")
@@ -0,0 +1,57 @@
+import logging
+import queue
+import threading
+import time
+
+_FIM = object()
+
+
+def carregar_em_fluxo(lotes, carregar, tamanho_carga=1000, cargas_em_espera=4):
+    """Consome `lotes` (gerador que extrai e transforma) enquanto uma thread grava as cargas já prontas.
+
+    Os registros são reagrupados em cargas de `tamanho_carga`. A fila aceita no máximo `cargas_em_espera`
+    cargas: se a gravação atrasar, a extração espera, e a memória fica limitada seja qual for o tamanho do
+    relatório. Retorna o total de registros gravados; um erro na gravação interrompe a extração e é propagado.
+    """
+    inicio = time.monotonic()
+    fila = queue.Queue(maxsize=cargas_em_espera)
+    erros = []
+    gravados = 0
+
+    def gravar():
+        nonlocal gravados
+        while True:
+            carga = fila.get()
+            if carga is _FIM:
+                return
+            if erros:
+                # Só esvazia a fila para a extração não ficar bloqueada
+                continue
+            try:
+                carregar(carga)
+                gravados += len(carga)
+                logging.info(f"Carga de {len(carga)} registros gravada... Total gravado: {gravados}")
+            except Exception as e:
+                erros.append(e)
+
+    gravador = threading.Thread(target=gravar, name="gravador", daemon=True)
+    gravador.start()
+    try:
+        carga = []
+        for lote in lotes:
+            if erros:
+                break
+            carga.extend(lote)
+            while len(carga) >= tamanho_carga:
+                fila.put(carga[:tamanho_carga])
+                carga = carga[tamanho_carga:]
+        if carga and not erros:
+            fila.put(carga)
+    finally:
+        fila.put(_FIM)
+        gravador.join()
+
+    if erros:
+        raise erros[0]
+    logging.info(f"Fluxo concluído: {gravados} registros gravados em {time.monotonic() - inicio:.2f}s")
+    return gravados
@@ -0,0 +1,136 @@
+import json
+import math
+
+
+class Registros:
+    """Registros guardados por coluna, com textos repetidos (operadora, status, corretor...) armazenados uma vez só.
+
+    Substitui a lista de dicts de 30+ chaves por linha: cada linha custa uma referência por coluna. Indexar ou
+    iterar devolve dicts montados na hora, e `para_json` serializa direto das colunas para o corpo do insert.
+    """
+
+    def __init__(self, registros=()):
+        self.colunas = {}
+        self._textos = {}
+        self._tamanho = 0
+        self.extend(registros)
+
+    def append(self, registro):
+        if not self.colunas:
+            self.colunas = {nome: [] for nome in registro}
+        textos = self._textos
+        for nome, coluna in self.colunas.items():
+            valor = registro[nome]
+            if type(valor) is str:
+                valor = textos.setdefault(valor, valor)
+            coluna.append(valor)
+        self._tamanho += 1
+
+    def extend(self, registros):
+        for registro in registros:
+            self.append(registro)
+
+    def __len__(self):
+        return self._tamanho
+
+    def __iter__(self):
+        nomes = list(self.colunas)
+        for valores in zip(*self.colunas.values()):
+            yield dict(zip(nomes, valores))
+
+    def __getitem__(self, indice):
+        nomes = list(self.colunas)
+        if isinstance(indice, slice):
+            return [dict(zip(nomes, valores)) for valores in zip(*(coluna[indice] for coluna in self.colunas.values()))]
+        return {nome: coluna[indice] for nome, coluna in self.colunas.items()}
+
+    def para_json(self, inicio=0, fim=None):
+        """Array JSON das linhas [inicio, fim), equivalente ao json.dumps da lista de dicts"""
+        fragmentos_por_coluna = []
+        for nome, coluna in self.colunas.items():
+            prefixo = json.dumps(nome) + ':'
+            # Cada valor distinto de texto/inteiro/None é codificado uma vez por coluna
+            codificados = {}
+            fragmentos = []
+            for valor in coluna[inicio:fim]:
+                if type(valor) is float:
+                    fragmento = prefixo + (repr(valor) if math.isfinite(valor) else json.dumps(valor))
+                else:
+                    chave = (type(valor), valor)
+                    fragmento = codificados.get(chave)
+                    if fragmento is None:
+                        fragmento = codificados[chave] = prefixo + json.dumps(valor)
+                fragmentos.append(fragmento)
+            fragmentos_por_coluna.append(fragmentos)
+        return '[' + ','.join('{' + ','.join(linha) + '}' for linha in zip(*fragmentos_por_coluna)) + ']'
+
+
+def inserir_registros(cliente, tabela, registros, inicio=0, fim=None):
+    """Insere as linhas [inicio, fim) com o corpo já serializado pelas colunas.
+
+    O insert() do postgrest exige a lista de dicts; aqui o POST vai direto pela sessão HTTP do cliente Supabase,
+    com os mesmos parâmetros que ele usaria (colunas explícitas) e sem devolver as linhas inseridas.
+    """
+    if isinstance(registros, list):
+        registros = Registros(registros)
+    return inserir_json(cliente, tabela, registros.colunas, registros.para_json(inicio, fim).encode('utf-8'))
+
+
+def inserir_json(cliente, tabela, colunas, corpo):
+    """POST de um array JSON já serializado (bytes) com as `colunas` informadas"""
+    resposta = cliente.postgrest.session.post(
+        f"/{tabela}",
+        params={'columns': ','.join(f'"{nome}"' for nome in colunas)},
+        content=corpo,
+        headers={'Content-Type': 'application/json', 'Prefer': 'return=minimal'},
+    )
+    resposta.raise_for_status()
+    return resposta
+
+
+if __name__ == "__main__":
+    # Medição com tracemalloc: lista de dicts (formato atual) vs. Registros, com linhas do relatório de comissões
+    import logging
+    import time
+    import tracemalloc
+
+    from automacao_comissao_2 import SixvoxComissaoScraper
+
+    logging.disable(logging.CRITICAL)
+
+    def linhas(quantidade):
+        # Cada célula é um objeto novo, como chega do extrator
+        for i in range(quantidade):
+            linha = [
+                f'{i % 28 + 1:02d}/11/2015', 'Ativa', f'Corretor {i % 300} ({i % 300})', str(i), f'TITULAR {i}', 'PF',
+                'HAPVIDA CLINIPAM (266)', '-DIRETO', str(i % 12 + 1), f'R$ {i % 9:d}.{i % 1000:03d},{i % 100:02d}',
+                f'{i % 28 + 1:02d}/12/2024', '100,00%', f'R$ {i % 1000},41', f'{i % 100},5%', 'R$ 737,94',
+                'R$ 737,94', 'Supervisor (4489)', '', 'Equipe (37)', str(12387735838 + i), '06/11/2024', '956',
+                '664', 'INDIVIDUAL SAÚDE (182)', '1', '15/11/2024', 'R$ 0,00', 'R$ 0,00', 'R$ 0,00', 'R$ 0,00',
+                'DIAMOND',
+            ]
+            yield [celula.encode().decode() for celula in linha]
+
+    quantidade = 50_000
+    for nome, recipiente in (("lista de dicts", list), ("Registros", Registros)):
+        esquema = SixvoxComissaoScraper.montar_esquema()
+        tracemalloc.start()
+        dados = recipiente()
+        lote = []
+        for posicao, linha in enumerate(linhas(quantidade)):
+            lote.append(linha)
+            if len(lote) == 100:
+                dados.extend(SixvoxComissaoScraper.processar_linhas(esquema, False, lote, posicao)[0])
+                lote = []
+        dados.extend(SixvoxComissaoScraper.processar_linhas(esquema, False, lote, quantidade)[0])
+        atual, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{nome}: {atual / 2**20:.1f} MiB retidos, pico {pico / 2**20:.1f} MiB ({quantidade} registros)")
+
+        inicio = time.perf_counter()
+        corpo = dados.para_json() if isinstance(dados, Registros) else json.dumps(dados)
+        print(f"  serialização: {time.perf_counter() - inicio:.2f}s, {len(corpo) / 2**20:.1f} MiB")
+        if isinstance(dados, Registros):
+            assert json.loads(corpo) == json.loads(referencia)
+        else:
+            referencia = corpo
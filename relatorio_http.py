@@ -0,0 +1,334 @@
+from bs4 import BeautifulSoup
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urljoin
+import httpx
+import logging
+import re
+import threading
+import time
+
+from sessao_sixvox import SessaoSixvox, URL_SIXVOX
+
+# Atribuições feitas pelo onclick dos botões de relatório, ex.: getElementById('command_argument').value='63'
+PADRAO_ATRIBUICAO = re.compile(r"""(\w+)['"]?\]?\)?\.value\s*=\s*['"]?([^'";)]*)['"]?""")
+
+# Relatórios conhecidos: link do submenu, command_argument do botão "alterar" e checkboxes a marcar
+RELATORIOS = {
+    'vendas': {'submenu': '#sub_vendas a', 'command_argument': 63, 'marcar': ()},
+    'comissoes': {'submenu': '#sub_confirma a', 'command_argument': 64, 'marcar': ('saude_dental',)},
+}
+
+
+def extrair_linhas_html(html, filtro_linha=None, colunas=None):
+    """Reproduz o script de extração do navegador: células de todo <tr> que não seja o cabeçalho Freezing"""
+    colunas = set(colunas) if colunas is not None else None
+    soup = BeautifulSoup(html, 'html.parser')
+    linhas = []
+    for tr in soup.find_all('tr'):
+        if 'Freezing' in (tr.get('class') or []):
+            continue
+        celulas = tr.find_all(['td', 'th'], recursive=False)
+        if not celulas:
+            continue
+        # Como textContent: texto dos filhos concatenado sem separador, espaços colapsados depois
+        linha = [
+            ' '.join(celula.get_text().split()) if colunas is None or indice in colunas else ''
+            for indice, celula in enumerate(celulas)
+        ]
+        if filtro_linha is None or filtro_linha(linha):
+            linhas.append(linha)
+    return linhas
+
+
+def gerar_particoes(inicio: date, fim: date, meses: int, abertas: bool = False):
+    """Divide [inicio, fim] em intervalos consecutivos de `meses` meses, sem sobreposição de dias.
+
+    Com `abertas`, acrescenta uma partição sem data inicial antes de `inicio` e uma sem data final depois de
+    `fim` (None no lugar da data), para que nenhuma data fique fora das partições.
+    """
+    particoes = [(None, inicio - timedelta(days=1))] if abertas else []
+    atual = inicio
+    while atual <= fim:
+        mes = atual.month - 1 + meses
+        proximo = date(atual.year + mes // 12, mes % 12 + 1, 1)
+        particoes.append((atual, min(proximo - timedelta(days=1), fim)))
+        atual = proximo
+    if abertas:
+        particoes.append((fim + timedelta(days=1), None))
+    return particoes
+
+
+def _data_filtro(data):
+    # Campo vazio no formulário: intervalo sem limite desse lado
+    return data.strftime('%d/%m/%Y') if data else ''
+
+
+def mesclar_particoes(partes):
+    """Junta as linhas das partições na ordem, descartando as repetidas por filtros que incluem as bordas.
+
+    Uma linha repetida dentro da mesma partição é legítima e é mantida: cada linha aparece no resultado
+    tantas vezes quanto na partição em que mais aparece.
+    """
+    vistas = Counter()
+    linhas = []
+    for parte in partes:
+        contagem = Counter()
+        for linha in parte:
+            chave = tuple(linha)
+            contagem[chave] += 1
+            if contagem[chave] > vistas[chave]:
+                vistas[chave] += 1
+                linhas.append(linha)
+    return linhas
+
+
+class ClienteHttpSixvox:
+    """Gera os relatórios do Sixvox reenviando os formulários por HTTP, sem Chrome no caminho principal"""
+
+    def __init__(self, sessao: SessaoSixvox, timeout: float = 180):
+        self.sessao = sessao
+        self.timeout = timeout
+        self.autenticado = False
+        self.http = httpx.Client(
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.fechar()
+        return False
+
+    def fechar(self):
+        self.http.close()
+
+    def _definir_cookies(self, cookies):
+        self.http.cookies.clear()
+        for cookie in cookies:
+            self.http.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+
+    def _sessao_valida(self):
+        resposta = self.http.get(URL_SIXVOX)
+        resposta.raise_for_status()
+        soup = BeautifulSoup(resposta.text, 'html.parser')
+        if soup.find(id='xenha'):
+            return None
+        return resposta
+
+    def autenticar(self):
+        """Usa os cookies salvos; sem eles faz o login por HTTP, e só abre o navegador se esse login falhar"""
+        cookies = self.sessao.carregar_cookies()
+        if cookies:
+            self._definir_cookies(cookies)
+            resposta = self._sessao_valida()
+            if resposta is not None:
+                logging.info("Sessão HTTP autenticada com os cookies salvos")
+                self.autenticado = True
+                return resposta
+
+        logging.info("Cookies indisponíveis ou expirados, realizando login por HTTP")
+        try:
+            return self.entrar()
+        except Exception as e:
+            logging.warning(f"Falha no login HTTP ({str(e)}), realizando login no navegador")
+
+        if not self.sessao.login():
+            return None
+        self._definir_cookies(self.sessao.driver.get_cookies())
+        resposta = self._sessao_valida()
+        self.autenticado = resposta is not None
+        return resposta
+
+    def entrar(self):
+        """Login por HTTP com LOGIN e SENHA, abrindo uma sessão própria no servidor (sem cookies salvos nem navegador)"""
+        self.http.cookies.clear()
+        resposta = self.http.get(URL_SIXVOX)
+        resposta.raise_for_status()
+        soup = BeautifulSoup(resposta.text, 'html.parser')
+        senha = soup.find(id='xenha')
+        if senha is None or senha.find_parent('form') is None:
+            raise Exception("Formulário de login não encontrado")
+
+        formulario = senha.find_parent('form')
+        campos = self._campos_formulario(formulario)
+        campos[self._nome_do_campo(formulario, 'email')] = [self.sessao.login_email]
+        campos[self._nome_do_campo(formulario, 'xenha')] = [self.sessao.login_senha]
+        # Formulários ASP.NET só tratam o clique se o nome do botão vier no POST
+        enviar = formulario.find(id='enviar')
+        if enviar is not None and enviar.get('name'):
+            campos[enviar['name']] = [enviar.get('value', '')]
+        self._enviar(formulario, str(resposta.url), campos)
+
+        resposta = self._sessao_valida()
+        self.autenticado = resposta is not None
+        if not self.autenticado:
+            raise Exception("Falha no login HTTP")
+        return resposta
+
+    def _pagina_inicial(self):
+        if self.autenticado:
+            resposta = self._sessao_valida()
+            if resposta is not None:
+                return resposta
+        return self.autenticar()
+
+    def _campos_formulario(self, formulario):
+        """Valores que o navegador enviaria no submit, inclusive campos ocultos"""
+        campos = {}
+        for campo in formulario.find_all(['input', 'select', 'textarea']):
+            nome = campo.get('name')
+            if not nome:
+                continue
+
+            tipo = (campo.get('type') or 'text').lower()
+            if tipo in ('submit', 'button', 'image', 'reset', 'file'):
+                continue
+            if tipo in ('checkbox', 'radio') and not campo.has_attr('checked'):
+                continue
+
+            if campo.name == 'select':
+                opcao = campo.find('option', selected=True) or campo.find('option')
+                valor = (opcao.get('value', opcao.get_text()) if opcao else '')
+            elif campo.name == 'textarea':
+                valor = campo.get_text()
+            else:
+                valor = campo.get('value', 'on' if tipo in ('checkbox', 'radio') else '')
+
+            campos.setdefault(nome, []).append(valor)
+        return campos
+
+    def _nome_do_campo(self, formulario, identificador):
+        elemento = formulario.find(id=identificador) or formulario.find(attrs={'name': identificador})
+        return elemento.get('name', identificador) if elemento else identificador
+
+    def _enviar(self, formulario, url_pagina, campos):
+        url = urljoin(url_pagina, formulario.get('action') or url_pagina)
+        if (formulario.get('method') or 'get').lower() == 'post':
+            resposta = self.http.post(url, data=campos)
+        else:
+            resposta = self.http.get(url, params=campos)
+        resposta.raise_for_status()
+        return resposta
+
+    def buscar_relatorio(self, nome, filtro_linha=None, colunas=None, campos_filtro=None):
+        """Repete o caminho do navegador (submenu, "alterar", "Executar Relatório") e devolve as linhas brutas.
+
+        `campos_filtro` preenche campos do formulário de filtros (por id ou name) antes de executar o relatório.
+        """
+        definicao = RELATORIOS[nome]
+        inicio = time.monotonic()
+
+        resposta = self._pagina_inicial()
+        if resposta is None:
+            raise Exception("Falha ao autenticar a sessão HTTP")
+
+        # Página de listagem dos relatórios
+        soup = BeautifulSoup(resposta.text, 'html.parser')
+        link = soup.select_one(definicao['submenu'])
+        if link is None or not link.get('href'):
+            raise Exception(f"Link do submenu {definicao['submenu']} não encontrado")
+        resposta = self.http.get(urljoin(str(resposta.url), link['href']))
+        resposta.raise_for_status()
+
+        # Seleção do relatório: replica as atribuições do onclick e submete o formulário
+        argumento = str(definicao['command_argument'])
+        soup = BeautifulSoup(resposta.text, 'html.parser')
+        botao = next(
+            (entrada for entrada in soup.find_all('input', onclick=True)
+             if 'command_argument' in entrada['onclick'] and 'alterar' in entrada['onclick'] and argumento in entrada['onclick']),
+            None
+        )
+        if botao is None or botao.find_parent('form') is None:
+            raise Exception(f"Botão do relatório {argumento} não encontrado")
+        formulario = botao.find_parent('form')
+        campos = self._campos_formulario(formulario)
+        for identificador, valor in PADRAO_ATRIBUICAO.findall(botao['onclick']):
+            campos[self._nome_do_campo(formulario, identificador)] = [valor]
+        resposta = self._enviar(formulario, str(resposta.url), campos)
+
+        # Filtros do relatório: marca os checkboxes pedidos e aciona "Executar Relatório"
+        soup = BeautifulSoup(resposta.text, 'html.parser')
+        gerar = soup.find('input', attrs={'name': 'gerar'})
+        if gerar is None or gerar.find_parent('form') is None:
+            raise Exception("Botão Executar Relatório não encontrado")
+        formulario = gerar.find_parent('form')
+        campos = self._campos_formulario(formulario)
+        for identificador in definicao['marcar']:
+            checkbox = formulario.find(id=identificador)
+            if checkbox is not None and checkbox.get('name'):
+                campos[checkbox['name']] = [checkbox.get('value', 'on')]
+        for identificador, valor in (campos_filtro or {}).items():
+            campos[self._nome_do_campo(formulario, identificador)] = [valor]
+        campos['gerar'] = [gerar.get('value', 'Executar Relatório')]
+        resposta = self._enviar(formulario, str(resposta.url), campos)
+
+        linhas = extrair_linhas_html(resposta.text, filtro_linha, colunas)
+        logging.info(f"Relatório {nome} obtido via HTTP em {time.monotonic() - inicio:.2f}s ({len(linhas)} linhas)")
+        return linhas
+
+
+def buscar_relatorio_particionado(sessao, nome, campo_inicio, campo_fim, particoes, trabalhadores=4,
+                                  filtro_linha=None, colunas=None, conferir=False):
+    """Gera o relatório uma vez por intervalo de datas, em paralelo, e junta as linhas na ordem das partições.
+
+    Cada trabalhador faz o próprio login: o servidor atende uma requisição por vez em cada sessão e guarda
+    nela o estado do formulário, então partições na mesma sessão não rodariam em paralelo e poderiam se
+    misturar.
+
+    Linhas sem a data do filtro não caem em nenhuma partição. Com `conferir`, o relatório sem partição é
+    gerado junto, numa sessão a mais, e uma contagem diferente levanta Exception em vez de devolver um
+    resultado incompleto.
+    """
+    inicio = time.monotonic()
+    locais = threading.local()
+    clientes = []
+    trava_clientes = threading.Lock()
+
+    def cliente_do_trabalhador():
+        cliente = getattr(locais, 'cliente', None)
+        if cliente is None:
+            cliente = ClienteHttpSixvox(sessao)
+            with trava_clientes:
+                clientes.append(cliente)
+            cliente.entrar()
+            locais.cliente = cliente
+        return cliente
+
+    def buscar(particao):
+        data_inicio, data_fim = particao
+        linhas = cliente_do_trabalhador().buscar_relatorio(nome, filtro_linha, colunas, campos_filtro={
+            campo_inicio: _data_filtro(data_inicio),
+            campo_fim: _data_filtro(data_fim),
+        })
+        logging.info(f"Partição {_data_filtro(data_inicio) or 'início'} a {_data_filtro(data_fim) or 'fim'}: {len(linhas)} linhas")
+        return linhas
+
+    def contar_sem_particao():
+        with ClienteHttpSixvox(sessao) as cliente:
+            cliente.entrar()
+            return len(cliente.buscar_relatorio(nome, filtro_linha, colunas))
+
+    try:
+        with ThreadPoolExecutor(max_workers=trabalhadores + (1 if conferir else 0)) as executor:
+            conferencia = executor.submit(contar_sem_particao) if conferir else None
+            partes = list(executor.map(buscar, particoes))
+            esperadas = conferencia.result() if conferencia else None
+    finally:
+        for cliente in clientes:
+            cliente.fechar()
+
+    linhas = mesclar_particoes(partes)
+    if esperadas is not None and len(linhas) != esperadas:
+        raise Exception(
+            f"Relatório {nome} particionado incompleto: {len(linhas)} linhas nas partições, {esperadas} sem partição"
+        )
+    logging.info(
+        f"Relatório {nome} obtido em {len(particoes)} partições por {len(clientes)} sessões em {time.monotonic() - inicio:.2f}s "
+        f"({len(linhas)} linhas, {sum(len(parte) for parte in partes) - len(linhas)} repetidas nas bordas)"
+    )
+    return linhas
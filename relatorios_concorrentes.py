@@ -0,0 +1,82 @@
+from collections import namedtuple
+from selenium.common.exceptions import WebDriverException
+import logging
+import time
+
+from sessao_sixvox import SessaoSixvox
+
+# sessao: SessaoSixvox logada em que o relatório é gerado, uma por tarefa
+# submeter: navega e aciona "Executar Relatório" sem aguardar (ex.: navegar_para_relatorio(aguardar=False))
+# localizador: elemento que indica o relatório renderizado; processar: extração + gravação, roda no Chrome da sessão
+TarefaRelatorio = namedtuple('TarefaRelatorio', ['nome', 'sessao', 'submeter', 'localizador', 'processar'])
+
+
+class ExecutorRelatoriosConcorrentes:
+    """Dispara vários relatórios, cada um no Chrome da sua sessão, e processa cada um assim que fica pronto.
+
+    O servidor guarda o estado do formulário de relatório na sessão: abas do mesmo Chrome compartilham os cookies,
+    e portanto a sessão, e poderiam misturar os relatórios. Por isso cada tarefa traz a sua própria sessão
+    (ver SessaoSixvox.sessao_independente), como as partições de relatorio_http.buscar_relatorio_particionado.
+    """
+
+    def __init__(self, timeout: float = 300, intervalo: float = 0.5):
+        self.timeout = timeout
+        self.intervalo = intervalo
+
+    def _relatorio_pronto(self, sessao: SessaoSixvox, localizador):
+        driver = sessao.driver
+        try:
+            return bool(driver.find_elements(*localizador)) and driver.execute_script("return document.readyState") == 'complete'
+        except WebDriverException:
+            # Página ainda trocando de documento
+            return False
+
+    def executar(self, tarefas):
+        """Retorna {nome: sucesso} para cada tarefa"""
+        if len({id(tarefa.sessao) for tarefa in tarefas}) < len(tarefas):
+            raise ValueError("Cada relatório concorrente precisa da própria sessão")
+
+        inicio = time.monotonic()
+        resultados = {}
+        pendentes = []
+
+        # Cada relatório é solicitado na sua sessão; o servidor gera todos ao mesmo tempo
+        for tarefa in tarefas:
+            try:
+                solicitado = tarefa.submeter()
+            except Exception as e:
+                logging.error(f"Erro ao solicitar relatório {tarefa.nome}: {str(e)}")
+                solicitado = False
+
+            if solicitado:
+                pendentes.append(tarefa)
+            else:
+                resultados[tarefa.nome] = False
+
+        logging.info(f"{len(pendentes)} relatórios solicitados em paralelo, aguardando renderização...")
+
+        # O prazo vale só para a renderização: um relatório pronto é processado mesmo que o processamento de
+        # outro tenha passado do prazo, porque a prontidão é verificada antes do prazo
+        prazo = inicio + self.timeout
+        while pendentes:
+            for tarefa in list(pendentes):
+                if not self._relatorio_pronto(tarefa.sessao, tarefa.localizador):
+                    if time.monotonic() >= prazo:
+                        pendentes.remove(tarefa)
+                        logging.error(f"Tempo de espera excedido para o relatório {tarefa.nome}")
+                        resultados[tarefa.nome] = False
+                    continue
+
+                pendentes.remove(tarefa)
+                logging.info(f"Relatório {tarefa.nome} pronto após {time.monotonic() - inicio:.2f}s, processando...")
+                try:
+                    resultados[tarefa.nome] = bool(tarefa.processar())
+                except Exception as e:
+                    logging.error(f"Erro ao processar relatório {tarefa.nome}: {str(e)}")
+                    resultados[tarefa.nome] = False
+
+            if pendentes:
+                time.sleep(self.intervalo)
+
+        logging.info(f"Relatórios concorrentes concluídos em {time.monotonic() - inicio:.2f}s")
+        return resultados
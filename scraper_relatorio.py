@@ -0,0 +1,278 @@
+"""Caminho comum dos scrapers de relatório (vendas, dimensao_comissao e comissoes): do relatório gerado à tabela.
+
+Cada scraper define só o que é dele: tabela, relatório HTTP, esquema (`montar_esquema`), navegação
+(`navegar_para_relatorio`) e validação das linhas (`processar_lote`). O resto do caminho (opções SIXVOX_*,
+extração em lotes e gravação, inteira ou em fluxo) fica aqui.
+"""
+from selenium import webdriver
+from supabase import create_client, Client
+import logging
+import os
+from typing import Optional
+
+from carregador import CarregadorSupabase
+from copia_postgres import CarregadorCopy
+from extracao import ExtratorTabela, lotes
+from impressao_relatorio import ImpressoesRelatorio, impressao_linhas
+from pipeline import carregar_em_fluxo
+from registros import Registros
+from relatorio_http import ClienteHttpSixvox
+from sessao_sixvox import SessaoSixvox
+from sincronizacao import sincronizar_tabela
+from troca_tabela import preparar_carga, publicar_carga, recarregar_com_troca, tabela_de_carga
+import transformacao_vetorizada as vetorizada
+
+
+class ScraperRelatorio:
+    """Base dos scrapers de relatório; as subclasses informam de onde vêm as credenciais do Supabase"""
+
+    # Tabela de destino, chave natural (sincronização incremental) e nome do relatório em relatorio_http
+    tabela = ''
+    chaves = ('proposta',)
+    relatorio = ''
+
+    def __init__(self, sessao: Optional[SessaoSixvox], variavel_url: str, variavel_chave: str):
+        # Obtém as credenciais das variáveis de ambiente
+        self.supabase_url: str = os.environ.get(variavel_url, '')
+        self.supabase_key: str = os.environ.get(variavel_chave, '')
+        self.login_email: str = os.environ.get('LOGIN', '')
+        self.login_senha: str = os.environ.get('SENHA', '')
+
+        if not all([self.supabase_url, self.supabase_key, self.login_email, self.login_senha]):
+            raise ValueError("Variáveis de ambiente necessárias não encontradas")
+
+        self.driver: Optional[webdriver.Chrome] = None
+        # Sessão compartilhada quando informada; caso contrário cada scraper abre a sua
+        self.sessao = sessao or SessaoSixvox(self.login_email, self.login_senha)
+        self._sessao_propria = sessao is None
+        # SIXVOX_MODO=http busca o relatório direto por HTTP em vez de navegar no Chrome
+        self.modo_http = os.environ.get('SIXVOX_MODO', '') == 'http'
+        # SIXVOX_TRANSFORMACAO=vetorizada converte cada lote coluna a coluna com pandas
+        self.transformacao_vetorizada = os.environ.get('SIXVOX_TRANSFORMACAO', '') == 'vetorizada'
+        # SIXVOX_PULAR_INALTERADO=1 não transforma nem grava um relatório idêntico ao da última carga
+        self.pular_inalterado = os.environ.get('SIXVOX_PULAR_INALTERADO', '') == '1'
+        # SIXVOX_SINCRONIZACAO=incremental grava só os registros que mudaram desde a última execução
+        self.sincronizacao_incremental = os.environ.get('SIXVOX_SINCRONIZACAO', '') == 'incremental'
+        # SIXVOX_SINCRONIZACAO=troca recarrega tudo numa tabela de preparação e publica de uma vez (ver troca_tabela)
+        self.troca_atomica = os.environ.get('SIXVOX_SINCRONIZACAO', '') == 'troca'
+        # SIXVOX_FLUXO=1 grava em cargas enquanto o restante do relatório ainda está sendo extraído;
+        # a sincronização incremental precisa do relatório inteiro para saber o que sumiu
+        self.em_fluxo = os.environ.get('SIXVOX_FLUXO', '') == '1' and not self.sincronizacao_incremental
+        if self.em_fluxo and self.pular_inalterado:
+            # A impressão só existe com o relatório inteiro, e no fluxo as cargas começam antes disso
+            logging.warning("SIXVOX_PULAR_INALTERADO=1 é ignorado com SIXVOX_FLUXO=1: o relatório será sempre gravado")
+        # Inicializando o cliente Supabase com type hints
+        self.supabase: Client = create_client(
+            supabase_url=self.supabase_url,
+            supabase_key=self.supabase_key
+        )
+        # Inserts em lotes concorrentes na sessão HTTP/2 do cliente; SIXVOX_CARGA_CONCORRENCIA limita as requisições simultâneas.
+        # Com SIXVOX_POSTGRES_URL os registros vão por COPY direto no Postgres, uma carga por conexão de um pool desse tamanho
+        concorrencia_carga = int(os.environ.get('SIXVOX_CARGA_CONCORRENCIA', '4'))
+        url_postgres = os.environ.get('SIXVOX_POSTGRES_URL', '')
+        if url_postgres:
+            self.carregador = CarregadorCopy(url_postgres, tamanho_pool=concorrencia_carga)
+        else:
+            self.carregador = CarregadorSupabase(self.supabase, concorrencia=concorrencia_carga)
+        # Impressões das últimas cargas na tabela de metadados SIXVOX_TABELA_IMPRESSOES ou num arquivo local
+        self.impressoes = ImpressoesRelatorio(self.supabase, os.environ.get('SIXVOX_TABELA_IMPRESSOES', ''))
+
+        # Configuração do logging
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+
+        self.esquema = self.montar_esquema()
+
+    def montar_esquema(self):
+        raise NotImplementedError
+
+    def navegar_para_relatorio(self, aguardar=True):
+        raise NotImplementedError
+
+    def processar_lote(self, batch, inicio=0):
+        """Converte e valida um lote de linhas brutas; retorna (registros válidos, mensagens de erro)"""
+        raise NotImplementedError
+
+    def login(self):
+        if not self.sessao.login():
+            return False
+        self.driver = self.sessao.driver
+        return True
+
+    def buscar_relatorio_http(self):
+        """Obtém as linhas do relatório reenviando o formulário por HTTP, sem navegar no Chrome"""
+        with ClienteHttpSixvox(self.sessao) as cliente:
+            return cliente.buscar_relatorio(self.relatorio, colunas=self.esquema.colunas)
+
+    def converter_lote(self, linhas):
+        """No modo vetorizado converte o lote inteiro de uma vez; posições None seguem pelo esquema linha a linha"""
+        convertidos = vetorizada.converter_lote(self.esquema, linhas) if self.transformacao_vetorizada else None
+        return convertidos or [None] * len(linhas)
+
+    def linhas_do_relatorio(self):
+        """Linhas do relatório aberto no navegador, lidas em lotes sob demanda"""
+        return ExtratorTabela(self.driver, colunas=self.esquema.colunas).linhas()
+
+    def calcular_impressao(self, raw_data=None):
+        """Lê o relatório inteiro e calcula sua impressão; retorna (linhas, impressão)"""
+        linhas = list(self.linhas_do_relatorio() if raw_data is None else raw_data)
+        return linhas, impressao_linhas(linhas)
+
+    def transformar_lotes(self, raw_data=None):
+        """Gera os registros válidos lote a lote, sem acumular o relatório inteiro"""
+        # No modo HTTP as linhas já chegam prontas; no navegador são lidas em lotes sob demanda
+        if raw_data is None:
+            raw_data = self.linhas_do_relatorio()
+
+        batch_size = 5000 if self.transformacao_vetorizada else 100
+        for numero_lote, batch in enumerate(lotes(raw_data, batch_size)):
+            batch_processed, _ = self.processar_lote(batch, numero_lote * batch_size)
+            yield batch_processed
+
+    def transformar_relatorio(self, raw_data=None):
+        """Registros válidos do relatório inteiro, em lotes; por padrão os de transformar_lotes"""
+        return self.transformar_lotes(raw_data)
+
+    def extrair_dados_tabela(self, raw_data=None):
+        try:
+            logging.info(f"Iniciando extração dos dados de {self.tabela}...")
+
+            # Registros por coluna: bem menos memória que uma lista de dicts em relatórios grandes
+            dados = Registros()
+
+            logging.info("Processando registros...")
+
+            for batch_processed in self.transformar_relatorio(raw_data):
+                dados.extend(batch_processed)
+                logging.info(f"Processado lote de {len(batch_processed)} registros... Total atual: {len(dados)}")
+
+            if dados:
+                logging.info(f"Extração concluída! Total de {len(dados)} registros válidos.")
+                return dados
+            else:
+                logging.warning("Nenhum registro válido foi encontrado após o processamento.")
+                return []
+
+        except Exception as e:
+            logging.error(f"Erro ao extrair dados da tabela {self.tabela}: {str(e)}")
+            return []
+
+    def limpar_tabela_supabase(self):
+        try:
+            logging.info(f"Iniciando limpeza da tabela {self.tabela}...")
+            self.supabase.table(self.tabela).delete().neq('id', 0).execute()
+            logging.info(f"Tabela {self.tabela} limpa com sucesso!")
+            return True
+        except Exception as e:
+            logging.error(f"Erro ao limpar tabela {self.tabela}: {str(e)}")
+            return False
+
+    def salvar_no_supabase(self, dados):
+        try:
+            if self.sincronizacao_incremental:
+                sincronizar_tabela(self.supabase, self.carregador, self.tabela, dados, self.chaves)
+                return True
+
+            if self.troca_atomica:
+                logging.info(f"Salvando {len(dados)} registros de {self.tabela} na tabela de preparação...")
+                recarregar_com_troca(self.supabase, self.carregador, self.tabela, dados)
+                return True
+
+            if self.limpar_tabela_supabase():
+                logging.info(f"Salvando {len(dados)} registros em {self.tabela}...")
+                self.carregador.inserir(self.tabela, dados)
+                logging.info("Dados salvos com sucesso!")
+                return True
+            return False
+        except Exception as e:
+            logging.error(f"Erro ao salvar dados em {self.tabela}: {str(e)}")
+            return False
+
+    def salvar_em_fluxo(self, raw_data=None):
+        """Extrai, transforma e grava em cargas enquanto o restante do relatório ainda está sendo lido.
+
+        A tabela só é limpa quando a primeira carga fica pronta; uma falha no meio do caminho a deixa parcial.
+        Com a troca atômica as cargas vão para a tabela de preparação, publicada só no fim.
+        """
+        tabela_limpa = False
+        destino = tabela_de_carga(self.tabela) if self.troca_atomica else self.tabela
+
+        def carregar(registros):
+            nonlocal tabela_limpa
+            if not tabela_limpa:
+                if self.troca_atomica:
+                    preparar_carga(self.supabase, self.tabela)
+                elif not self.limpar_tabela_supabase():
+                    raise Exception(f"Falha ao limpar a tabela {self.tabela}")
+                tabela_limpa = True
+            self.carregador.inserir(destino, registros)
+
+        try:
+            logging.info(f"Iniciando extração e gravação de {self.tabela} em fluxo...")
+            total = carregar_em_fluxo(self.transformar_lotes(raw_data), carregar)
+            if not total:
+                logging.warning("Nenhum registro válido foi encontrado após o processamento.")
+                return False
+            if self.troca_atomica:
+                publicar_carga(self.supabase, self.tabela, total)
+            logging.info(f"{total} registros de {self.tabela} gravados em fluxo com sucesso!")
+            return True
+        except Exception as e:
+            logging.error(f"Erro ao extrair e salvar {self.tabela} em fluxo: {str(e)}")
+            return False
+
+    def carregar_relatorio(self, raw_data=None):
+        """Transforma e grava o relatório já gerado (em fluxo, ou inteiro com a verificação de impressão).
+
+        `raw_data` são as linhas já obtidas (HTTP ou extração compartilhada); sem elas, lê o relatório aberto
+        no navegador. Levanta Exception na falha.
+        """
+        if self.em_fluxo:
+            if not self.salvar_em_fluxo(raw_data):
+                raise Exception(f"Falha na extração e gravação de {self.tabela} em fluxo")
+            return True
+
+        impressao = None
+        if self.pular_inalterado:
+            raw_data, impressao = self.calcular_impressao(raw_data)
+            if self.impressoes.inalterado(self.tabela, impressao):
+                return True
+
+        dados = self.extrair_dados_tabela(raw_data)
+        if not dados:
+            raise Exception(f"Nenhum dado de {self.tabela} extraído")
+
+        if not self.salvar_no_supabase(dados):
+            raise Exception(f"Falha ao salvar dados de {self.tabela} no Supabase")
+
+        if impressao:
+            self.impressoes.registrar(self.tabela, impressao)
+        return True
+
+    def executar_scraping(self):
+        try:
+            if self.modo_http:
+                raw_data = self.buscar_relatorio_http()
+            else:
+                if not self.login():
+                    raise Exception("Falha no login")
+
+                if not self.navegar_para_relatorio():
+                    raise Exception(f"Falha na navegação para o relatório de {self.tabela}")
+                raw_data = None
+
+            self.carregar_relatorio(raw_data)
+
+            logging.info(f"Processo de scraping de {self.tabela} concluído com sucesso!")
+            return True
+
+        except Exception as e:
+            logging.error(f"Erro crítico durante a execução do scraping de {self.tabela}: {str(e)}")
+            return False
+
+        finally:
+            self.esquema.registrar_estatisticas_cache()
+            if self._sessao_propria:
+                self.sessao.encerrar()
@@ -0,0 +1,335 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+import fcntl
+import json
+import logging
+import os
+import shutil
+import tarfile
+import time
+from typing import Optional
+
+URL_SIXVOX = "http://vhseguro.sixvox.com.br/"
+ARQUIVO_COOKIES_PADRAO = ".sixvox_cookies.json"
+
+# Limite padrão do cache HTTP em disco do perfil persistente (Chrome + poda ao encerrar), em MB
+TAMANHO_MAXIMO_CACHE_MB = 200
+
+# Arquivos do perfil com a sessão autenticada: ficam fora do artefato salvo
+ARQUIVOS_SESSAO = ('Cookies', 'Cookies-journal', 'Login Data', 'Login Data-journal')
+
+# Travas que o Chrome deixa no perfil quando é encerrado à força
+ARQUIVOS_SINGLETON = ('SingletonLock', 'SingletonSocket', 'SingletonCookie')
+
+# Recursos que o perfil enxuto não baixa: só lemos o texto das tabelas
+URLS_BLOQUEADAS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*hotjar.com*",
+]
+
+
+class SessaoSixvox:
+    """Mantém um único Chrome logado no Sixvox e o entrega aos scrapers em sequência"""
+
+    def __init__(self, login_email: Optional[str] = None, login_senha: Optional[str] = None, headless: bool = True,
+                 arquivo_cookies: Optional[str] = None, navegador_enxuto: Optional[bool] = None,
+                 diretorio_perfil: Optional[str] = None):
+        self.login_email: str = login_email or os.environ.get('LOGIN', '')
+        self.login_senha: str = login_senha or os.environ.get('SENHA', '')
+
+        if not all([self.login_email, self.login_senha]):
+            raise ValueError("Variáveis de ambiente LOGIN e SENHA não encontradas")
+
+        self.headless = headless
+        # Perfil enxuto (opt-in): sem imagens, fontes, CSS e analytics, carregamento eager e renderer limitado
+        self.navegador_enxuto = navegador_enxuto if navegador_enxuto is not None else os.environ.get('SIXVOX_NAVEGADOR_ENXUTO', '') == '1'
+        # Cookies autenticados salvos entre execuções (SIXVOX_COOKIES vazio desativa o cache). Valem para execuções
+        # locais ou em runner próprio: uma sessão válida não deve ir para o cache do Actions, que PRs conseguem restaurar
+        self.arquivo_cookies: str = arquivo_cookies if arquivo_cookies is not None else os.environ.get('SIXVOX_COOKIES', ARQUIVO_COOKIES_PADRAO)
+        # Perfil persistente com cache em disco entre execuções (vazio usa perfil temporário)
+        self.diretorio_perfil: str = diretorio_perfil if diretorio_perfil is not None else os.environ.get('SIXVOX_PERFIL_CHROME', '')
+        self.artefato_perfil: str = os.environ.get('SIXVOX_PERFIL_ARTEFATO', '')
+        # SIXVOX_PERFIL_CACHE_MB limita o cache em disco (menor em runners que guardam o cache entre execuções)
+        self.tamanho_maximo_cache = int(os.environ.get('SIXVOX_PERFIL_CACHE_MB', TAMANHO_MAXIMO_CACHE_MB)) * 1024 * 1024
+        self._trava_perfil = None
+        self.driver: Optional[webdriver.Chrome] = None
+        self.url_inicial: Optional[str] = None
+        self.logado = False
+
+        # Configuração do logging
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.encerrar()
+        return False
+
+    def sessao_independente(self):
+        """Outra sessão com as mesmas credenciais e opções, mas com login próprio no servidor.
+
+        Sem cookies salvos (que a fariam reaproveitar a sessão do servidor desta) nem perfil persistente
+        (travado por esta enquanto ela estiver aberta).
+        """
+        return SessaoSixvox(self.login_email, self.login_senha, headless=self.headless, arquivo_cookies='',
+                            navegador_enxuto=self.navegador_enxuto, diretorio_perfil='')
+
+    def setup_driver(self):
+        chrome_options = Options()
+        if self.headless:
+            chrome_options.add_argument('--headless=new')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--window-size=1920,1080')
+        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        if self.navegador_enxuto:
+            self._aplicar_perfil_enxuto(chrome_options)
+        if self.diretorio_perfil and self._preparar_perfil():
+            chrome_options.add_argument(f'--user-data-dir={os.path.abspath(self.diretorio_perfil)}')
+            chrome_options.add_argument(f'--disk-cache-dir={os.path.abspath(self._diretorio_cache())}')
+            chrome_options.add_argument(f'--disk-cache-size={self.tamanho_maximo_cache}')
+
+        service = Service()
+        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        self.aplicar_bloqueios()
+
+        logging.info("Driver do Chrome inicializado com sucesso" + (" em modo headless" if self.headless else " em modo visual")
+                     + (" com perfil enxuto" if self.navegador_enxuto else ""))
+
+    def aplicar_bloqueios(self):
+        """Bloqueia os recursos do perfil enxuto na aba atual; o CDP aplica o bloqueio por aba, não ao navegador"""
+        if self.navegador_enxuto:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': URLS_BLOQUEADAS})
+
+    def _aplicar_perfil_enxuto(self, chrome_options):
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--disable-background-networking')
+        chrome_options.add_argument('--disable-component-update')
+        chrome_options.add_argument('--disable-default-apps')
+        chrome_options.add_argument('--mute-audio')
+        chrome_options.add_argument('--renderer-process-limit=1')
+        chrome_options.add_argument('--js-flags=--max-old-space-size=512')
+        chrome_options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+
+    def _diretorio_cache(self):
+        return os.path.join(self.diretorio_perfil, 'cache')
+
+    def _preparar_perfil(self, timeout=60):
+        """Trava o perfil persistente para esta execução; sem a trava o Chrome usa um perfil temporário"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.diretorio_perfil)), exist_ok=True)
+        self._trava_perfil = open(f"{self.diretorio_perfil}.lock", 'w')
+        prazo = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(self._trava_perfil, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() > prazo:
+                    logging.warning(f"Perfil {self.diretorio_perfil} em uso por outro job, usando perfil temporário")
+                    self._liberar_perfil()
+                    return False
+                time.sleep(0.5)
+
+        if not os.path.isdir(self.diretorio_perfil) and self.artefato_perfil and os.path.exists(self.artefato_perfil):
+            with tarfile.open(self.artefato_perfil) as artefato:
+                artefato.extractall(self.diretorio_perfil, filter='data')
+            logging.info(f"Perfil do Chrome restaurado a partir de {self.artefato_perfil}")
+        os.makedirs(self.diretorio_perfil, exist_ok=True)
+
+        # Com a trava em mãos, travas antigas do Chrome só podem ser restos de uma execução interrompida
+        for nome in ARQUIVOS_SINGLETON:
+            caminho = os.path.join(self.diretorio_perfil, nome)
+            if os.path.lexists(caminho):
+                os.remove(caminho)
+
+        logging.info(f"Usando perfil persistente do Chrome em {self.diretorio_perfil}")
+        return True
+
+    def _podar_cache(self):
+        """Remove os arquivos de cache menos usados até o diretório caber no limite do cache"""
+        arquivos = []
+        for raiz, _, nomes in os.walk(self._diretorio_cache()):
+            for nome in nomes:
+                caminho = os.path.join(raiz, nome)
+                try:
+                    estado = os.stat(caminho)
+                except OSError:
+                    continue
+                arquivos.append((estado.st_atime, estado.st_size, caminho))
+
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        if total <= self.tamanho_maximo_cache:
+            return
+
+        removidos = 0
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self.tamanho_maximo_cache:
+                break
+            try:
+                os.remove(caminho)
+            except OSError:
+                continue
+            total -= tamanho
+            removidos += 1
+        logging.info(f"Cache do perfil podado: {removidos} arquivos removidos")
+
+    def _liberar_perfil(self):
+        if self._trava_perfil is not None:
+            fcntl.flock(self._trava_perfil, fcntl.LOCK_UN)
+            self._trava_perfil.close()
+            self._trava_perfil = None
+
+    def _salvar_artefato_perfil(self):
+        caminho_temporario = f"{self.artefato_perfil}.tmp"
+        with tarfile.open(caminho_temporario, 'w:gz') as artefato:
+            # Sem cookies nem logins salvos: o artefato não carrega uma sessão válida do portal
+            artefato.add(self.diretorio_perfil, arcname='.',
+                         filter=lambda membro: None if os.path.basename(membro.name) in ARQUIVOS_SESSAO else membro)
+        shutil.move(caminho_temporario, self.artefato_perfil)
+        logging.info(f"Perfil do Chrome salvo em {self.artefato_perfil}")
+
+    def login(self):
+        """Faz o login apenas na primeira chamada; nas seguintes volta à página inicial logada"""
+        if self.logado:
+            return self.voltar_para_inicio()
+
+        try:
+            if self.driver is None:
+                self.setup_driver()
+            self.driver.get(URL_SIXVOX)
+
+            if self.restaurar_cookies():
+                self.url_inicial = self.driver.current_url
+                self.logado = True
+                logging.info("Sessão restaurada a partir dos cookies salvos, login dispensado")
+                return True
+
+            # Espera o campo de email estar disponível
+            email = WebDriverWait(self.driver, 15).until(
+                EC.presence_of_element_located((By.XPATH, '//*[@id="email"]'))
+            )
+            email.clear()
+            email.send_keys(self.login_email)
+
+            # Preenche a senha
+            password = self.driver.find_element(By.XPATH, '//*[@id="xenha"]')
+            password.clear()
+            password.send_keys(self.login_senha)
+
+            # Clica no botão de login e aguarda a página de login ser substituída
+            login_button = self.driver.find_element(By.XPATH, '//*[@id="enviar"]')
+            login_button.click()
+            WebDriverWait(self.driver, 15).until(EC.staleness_of(login_button))
+
+            self.url_inicial = self.driver.current_url
+            self.logado = True
+            logging.info("Login realizado com sucesso!")
+            self.salvar_cookies()
+            return True
+        except Exception as e:
+            logging.error(f"Erro durante o login: {str(e)}")
+            return False
+
+    def sessao_ativa(self):
+        """Sonda barata: a sessão vale se a página carregada não exibe o formulário de login"""
+        return not self.driver.find_elements(By.XPATH, '//*[@id="xenha"]')
+
+    def salvar_cookies(self):
+        if not self.arquivo_cookies:
+            return
+        try:
+            with open(self.arquivo_cookies, 'w', encoding='utf-8') as arquivo:
+                json.dump(self.driver.get_cookies(), arquivo)
+            os.chmod(self.arquivo_cookies, 0o600)
+            logging.info(f"Cookies da sessão salvos em {self.arquivo_cookies}")
+        except Exception as e:
+            logging.warning(f"Não foi possível salvar os cookies da sessão: {str(e)}")
+
+    def carregar_cookies(self):
+        """Lê os cookies salvos descartando os já expirados; lista vazia se não houver cache utilizável"""
+        if not self.arquivo_cookies or not os.path.exists(self.arquivo_cookies):
+            return []
+
+        try:
+            with open(self.arquivo_cookies, encoding='utf-8') as arquivo:
+                cookies = json.load(arquivo)
+        except Exception as e:
+            logging.warning(f"Não foi possível ler os cookies salvos: {str(e)}")
+            return []
+
+        agora = time.time()
+        return [cookie for cookie in cookies if cookie.get('expiry', agora + 1) > agora]
+
+    def restaurar_cookies(self):
+        """Injeta os cookies salvos no driver e confirma que ainda autenticam; False cai no login normal"""
+        if not self.arquivo_cookies or not os.path.exists(self.arquivo_cookies):
+            return False
+
+        try:
+            validos = self.carregar_cookies()
+            if not validos:
+                logging.info("Cookies salvos expirados, realizando login completo")
+                return False
+
+            # O driver já está no domínio do Sixvox, requisito do add_cookie
+            for cookie in validos:
+                self.driver.add_cookie(cookie)
+            self.driver.get(URL_SIXVOX)
+
+            if self.sessao_ativa():
+                return True
+
+            logging.info("Sessão salva expirou no servidor, realizando login completo")
+        except Exception as e:
+            logging.warning(f"Falha ao restaurar cookies da sessão: {str(e)}")
+
+        self.driver.delete_all_cookies()
+        self.driver.get(URL_SIXVOX)
+        return False
+
+    def voltar_para_inicio(self):
+        """Recarrega a página pós-login para que o próximo scraper encontre os menus"""
+        try:
+            self.driver.get(self.url_inicial or URL_SIXVOX)
+            logging.info("Sessão reaproveitada, de volta à página inicial")
+            return True
+        except Exception as e:
+            logging.error(f"Erro ao reaproveitar a sessão: {str(e)}")
+            return False
+
+    def encerrar(self):
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+            self.logado = False
+            logging.info("Driver do Chrome encerrado")
+
+        if self._trava_perfil is not None:
+            try:
+                self._podar_cache()
+                if self.artefato_perfil:
+                    self._salvar_artefato_perfil()
+            except Exception as e:
+                logging.warning(f"Erro ao finalizar o perfil persistente: {str(e)}")
+            finally:
+                self._liberar_perfil()
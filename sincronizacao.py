@@ -0,0 +1,118 @@
+"""Sincronização incremental: em vez de apagar a tabela e reinserir tudo, grava só o que mudou.
+
+Cada registro recebe uma impressão digital do seu conteúdo (coluna `hash_registro`) e é agrupado pela
+chave natural (proposta, ou proposta + parcela). Da tabela só se leem a chave e a impressão; grupos novos
+ou com conteúdo diferente são regravados, grupos que sumiram do relatório são apagados e o resto não é
+tocado. A tabela nunca fica vazia no meio da execução.
+
+Requer a coluna nas tabelas sincronizadas, por exemplo:
+
+    alter table vendas add column hash_registro text;
+
+Na primeira execução as linhas antigas não têm impressão, então todo o conteúdo é regravado uma vez.
+"""
+from collections import Counter
+import hashlib
+import json
+import logging
+import time
+
+COLUNA_IMPRESSAO = 'hash_registro'
+
+
+def impressao(registro):
+    """Impressão digital do conteúdo do registro, estável entre execuções"""
+    return hashlib.blake2b(json.dumps(registro, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def projecao_texto(registro, colunas):
+    """Valores de `colunas` como texto (None continua None), para comparar o que a tabela devolve com o relatório"""
+    # Texto dos dois lados: a tabela pode devolver como número o que o relatório traz como texto
+    return tuple(None if registro[coluna] is None else str(registro[coluna]) for coluna in colunas)
+
+
+def _chave(registro, chaves):
+    return projecao_texto(registro, chaves)
+
+
+def _filtro_grupos(chaves, grupos):
+    """Filtro `or` do PostgREST que casa as linhas de qualquer um dos grupos"""
+    condicoes = []
+    for grupo in grupos:
+        partes = []
+        for coluna, valor in zip(chaves, grupo):
+            if valor is None:
+                partes.append(f"{coluna}.is.null")
+            else:
+                escapado = valor.replace('\\', '\\\\').replace('"', '\\"')
+                partes.append(f'{coluna}.eq."{escapado}"')
+        condicoes.append(partes[0] if len(partes) == 1 else f"and({','.join(partes)})")
+    return ','.join(condicoes)
+
+
+def ler_tabela(cliente, tabela, colunas, ordem='id', tamanho_pagina=1000):
+    """Linhas de `colunas` da tabela inteira, lidas em páginas ordenadas por `ordem`"""
+    inicio = 0
+    while True:
+        # Avança pelo que veio, não pelo tamanho pedido: o servidor pode limitar as linhas por resposta
+        pagina = cliente.table(tabela).select(','.join(colunas)).order(ordem).range(inicio, inicio + tamanho_pagina - 1).execute().data
+        if not pagina:
+            return
+        yield from pagina
+        inicio += len(pagina)
+
+
+def ler_impressoes(cliente, tabela, chaves):
+    """{chave: Counter de impressões} do que já está na tabela, lendo só a chave e a impressão"""
+    existentes = {}
+    for linha in ler_tabela(cliente, tabela, [*chaves, COLUNA_IMPRESSAO]):
+        existentes.setdefault(_chave(linha, chaves), Counter())[linha[COLUNA_IMPRESSAO]] += 1
+    return existentes
+
+
+def sincronizar_tabela(cliente, carregador, tabela, registros, chaves, grupos_por_lote=100):
+    """Aplica à tabela só a diferença para `registros`, agrupados pela chave natural `chaves`.
+
+    Grupos alterados são apagados e regravados lote a lote pelo `carregador` (o mesmo das recargas completas),
+    e os que sumiram são apagados no fim.
+    Retorna as contagens de grupos novos, alterados, removidos e inalterados e de linhas gravadas.
+    """
+    inicio = time.monotonic()
+    novos = {}
+    for registro in registros:
+        registro[COLUNA_IMPRESSAO] = impressao(registro)
+        novos.setdefault(_chave(registro, chaves), []).append(registro)
+
+    existentes = ler_impressoes(cliente, tabela, chaves)
+    alterados = [
+        grupo for grupo, linhas in novos.items()
+        if Counter(linha[COLUNA_IMPRESSAO] for linha in linhas) != existentes.get(grupo)
+    ]
+    removidos = [grupo for grupo in existentes if grupo not in novos]
+
+    gravadas = 0
+    for i in range(0, len(alterados), grupos_por_lote):
+        lote = alterados[i:i + grupos_por_lote]
+        substituidos = [grupo for grupo in lote if grupo in existentes]
+        if substituidos:
+            cliente.table(tabela).delete().or_(_filtro_grupos(chaves, substituidos)).execute()
+        linhas = [linha for grupo in lote for linha in novos[grupo]]
+        carregador.inserir(tabela, linhas)
+        gravadas += len(linhas)
+
+    for i in range(0, len(removidos), grupos_por_lote):
+        cliente.table(tabela).delete().or_(_filtro_grupos(chaves, removidos[i:i + grupos_por_lote])).execute()
+
+    contagens = {
+        'novos': sum(1 for grupo in alterados if grupo not in existentes),
+        'alterados': sum(1 for grupo in alterados if grupo in existentes),
+        'removidos': len(removidos),
+        'inalterados': len(novos) - len(alterados),
+        'linhas_gravadas': gravadas,
+    }
+    logging.info(
+        f"Sincronização de {tabela}: {contagens['novos']} novos, {contagens['alterados']} alterados, "
+        f"{contagens['removidos']} removidos, {contagens['inalterados']} inalterados "
+        f"({gravadas} linhas gravadas em {time.monotonic() - inicio:.2f}s)"
+    )
+    return contagens
@@ -0,0 +1,125 @@
+from datetime import date, datetime, timedelta
+from urllib.parse import parse_qs
+import threading
+import time
+import uuid
+
+import httpx
+import pytest
+
+import relatorio_http
+
+
+class ServidorSixvox:
+    """Sixvox falso para relatorio_http: login por formulário, relatório 64 com filtro de datas e uma
+    requisição por vez em cada sessão, como o servidor real (requisições simultâneas ficam em `violacoes`)"""
+
+    def __init__(self, linhas):
+        # (data do filtro ou None, valor); o relatório traz a data formatada e o valor
+        self.linhas = linhas
+        self.sessoes = {}
+        self.logins = []
+        self.violacoes = []
+        self.trava = threading.Lock()
+
+    def pagina_login(self):
+        return ('<form method="post" action="/"><input type="hidden" name="__VIEWSTATE" value="v">'
+                '<input id="email" name="email"><input id="xenha" name="xenha" type="password">'
+                '<input id="enviar" type="submit" name="enviar" value="Entrar"></form>')
+
+    def atender(self, requisicao):
+        sessao = requisicao.headers.get('cookie', '').partition('SID=')[2].split(';')[0]
+        corpo = parse_qs(requisicao.content.decode()) if requisicao.method == 'POST' else {}
+
+        if requisicao.url.path == '/' and 'xenha' in corpo:
+            if corpo.get('enviar') == ['Entrar'] and corpo['email'] == ['u'] and corpo['xenha'] == ['p']:
+                nova = uuid.uuid4().hex
+                with self.trava:
+                    self.sessoes[nova] = 0
+                    self.logins.append(nova)
+                return httpx.Response(302, headers={'location': '/', 'set-cookie': f'SID={nova}; Path=/'})
+            return httpx.Response(200, text=self.pagina_login())
+        if sessao not in self.sessoes:
+            return httpx.Response(200, text=self.pagina_login())
+
+        with self.trava:
+            self.sessoes[sessao] += 1
+            if self.sessoes[sessao] > 1:
+                self.violacoes.append(sessao)
+        try:
+            # Dá tempo para outra requisição na mesma sessão se sobrepor, se houver
+            time.sleep(0.005)
+            return self.pagina(requisicao.url.path, corpo)
+        finally:
+            with self.trava:
+                self.sessoes[sessao] -= 1
+
+    def pagina(self, caminho, corpo):
+        if caminho == '/':
+            return httpx.Response(200, text='<div id="sub_confirma"><a href="/lista">Comissões</a></div>')
+        if caminho == '/lista':
+            return httpx.Response(200, text=(
+                '<form method="post" action="/filtros">'
+                '<input type="hidden" id="command_argument" name="command_argument" value="">'
+                '<input type="button" onclick="getElementById(\'command_argument\').value=\'64\'; alterar()">'
+                '</form>'
+            ))
+        if caminho == '/filtros':
+            return httpx.Response(200, text=(
+                '<form method="post" action="/gerar"><input type="checkbox" id="saude_dental" name="sd">'
+                '<input name="dt_ini" value=""><input name="dt_fim" value="">'
+                '<input type="submit" name="gerar" value="Executar Relatório"></form>'
+            ))
+        if caminho == '/gerar':
+            inicio = self._data(corpo.get('dt_ini', [''])[0])
+            fim = self._data(corpo.get('dt_fim', [''])[0])
+            sem_filtro = inicio is None and fim is None
+            selecionadas = [
+                (data, valor) for data, valor in self.linhas
+                if sem_filtro or (data is not None and (inicio is None or data >= inicio) and (fim is None or data <= fim))
+            ]
+            linhas = ''.join(
+                f"<tr><td>{data.strftime('%d/%m/%Y') if data else ''}</td><td>{valor}</td></tr>"
+                for data, valor in selecionadas
+            )
+            return httpx.Response(200, text=f'<table><tr class="Freezing"><th>Data</th><th>Valor</th></tr>{linhas}</table>')
+        return httpx.Response(404)
+
+    @staticmethod
+    def _data(texto):
+        return datetime.strptime(texto, '%d/%m/%Y').date() if texto else None
+
+
+class SessaoFalsa:
+    """O que ClienteHttpSixvox usa de SessaoSixvox: credenciais e cookies salvos (nenhum)"""
+    login_email = 'u'
+    login_senha = 'p'
+
+    def carregar_cookies(self):
+        return []
+
+    def login(self):
+        raise AssertionError("o navegador não deveria ser aberto")
+
+
+# Linhas antes, dentro e depois da janela padrão das partições (2015 a hoje + 366 dias)
+LINHAS_PADRAO = [(date(2015, 1, 1) + timedelta(days=37 * i), str(i)) for i in range(150)]
+LINHAS_PADRAO += [(date(2010, 5, 5), 'antiga'), (date(2031, 1, 1), 'futura')]
+
+
+@pytest.fixture
+def servidor_sixvox(monkeypatch):
+    """Servidor falso instalado no httpx.Client de relatorio_http; `servidor.linhas` pode ser trocado no teste"""
+    servidor = ServidorSixvox(list(LINHAS_PADRAO))
+    cliente_original = httpx.Client
+
+    def cliente(**opcoes):
+        return cliente_original(transport=httpx.MockTransport(servidor.atender), base_url=relatorio_http.URL_SIXVOX, **opcoes)
+
+    monkeypatch.setattr(relatorio_http.httpx, 'Client', cliente)
+    return servidor
+
+
+@pytest.fixture
+def sessao_falsa():
+    return SessaoFalsa()
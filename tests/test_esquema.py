@@ -0,0 +1,49 @@
+from esquema import Campo, Esquema, memorizar
+
+
+def _esquema():
+    return Esquema([
+        Campo('proposta', 0),
+        Campo('valor', 1, float),
+        Campo('corretor', 2, str.upper, padrao=''),
+        Campo('fixo', None, padrao='sixvox'),
+    ])
+
+
+def test_compilar_aplica_conversores():
+    converter = _esquema().compilar(3)
+
+    assert converter(['10', '1.5', 'ana']) == {'proposta': '10', 'valor': 1.5, 'corretor': 'ANA', 'fixo': 'sixvox'}
+
+
+def test_compilar_usa_o_padrao_nas_colunas_ausentes():
+    converter = _esquema().compilar(2)
+
+    # A coluna 2 não existe nesse formato de linha: o conversor nem é chamado
+    assert converter(['10', '1.5']) == {'proposta': '10', 'valor': 1.5, 'corretor': '', 'fixo': 'sixvox'}
+
+
+def test_compilar_reaproveita_o_conversor_por_quantidade_de_colunas():
+    esquema = _esquema()
+
+    assert esquema.compilar(3) is esquema.compilar(3)
+    assert esquema.compilar(3) is not esquema.compilar(2)
+
+
+def test_colunas_lidas_pelo_esquema():
+    assert _esquema().colunas == [0, 1, 2]
+
+
+def test_converter_com_conversor_memorizado():
+    chamadas = []
+
+    def maiusculas(texto):
+        chamadas.append(texto)
+        return texto.upper()
+
+    esquema = Esquema([Campo('corretor', 0, memorizar(maiusculas))])
+
+    assert [esquema.converter([nome]) for nome in ('ana', 'bia', 'ana')] == [
+        {'corretor': 'ANA'}, {'corretor': 'BIA'}, {'corretor': 'ANA'}
+    ]
+    assert chamadas == ['ana', 'bia']
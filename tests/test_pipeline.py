@@ -0,0 +1,42 @@
+import pytest
+
+from pipeline import carregar_em_fluxo
+
+
+def test_carregar_em_fluxo_reagrupa_em_cargas():
+    cargas = []
+
+    total = carregar_em_fluxo(([i] * 3 for i in range(10)), cargas.append, tamanho_carga=4)
+
+    assert total == 30
+    assert [len(carga) for carga in cargas] == [4] * 7 + [2]
+    assert [registro for carga in cargas for registro in carga] == [i for i in range(10) for _ in range(3)]
+
+
+def test_erro_na_gravacao_interrompe_a_extracao_e_e_propagado():
+    extraidos = []
+
+    def lotes():
+        for i in range(1000):
+            extraidos.append(i)
+            yield [i]
+
+    def carregar(carga):
+        raise RuntimeError("falha no insert")
+
+    with pytest.raises(RuntimeError, match="falha no insert"):
+        carregar_em_fluxo(lotes(), carregar, tamanho_carga=1, cargas_em_espera=2)
+    assert len(extraidos) < 1000
+
+
+def test_erro_na_extracao_e_propagado():
+    cargas = []
+
+    def lotes():
+        yield [1, 2]
+        raise ValueError("falha na extração")
+
+    with pytest.raises(ValueError, match="falha na extração"):
+        carregar_em_fluxo(lotes(), cargas.append, tamanho_carga=1)
+    # O gravador terminou o que já estava na fila antes de o erro subir
+    assert cargas == [[1], [2]]
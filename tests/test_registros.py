@@ -0,0 +1,38 @@
+import json
+
+from registros import Registros
+
+
+LINHAS = [
+    {'proposta': '1', 'valor': 10.5, 'parcela': 1, 'corretor': 'Ana "A" (12)', 'ativo': True, 'data': None},
+    {'proposta': '2', 'valor': -0.1, 'parcela': 2, 'corretor': 'José \\ Ç', 'ativo': False, 'data': '01/02/2024'},
+    {'proposta': '2', 'valor': 10.5, 'parcela': 1, 'corretor': 'Ana "A" (12)', 'ativo': True, 'data': None},
+    {'proposta': '3', 'valor': float('nan'), 'parcela': 0, 'corretor': '', 'ativo': 1, 'data': '01/02/2024'},
+]
+
+
+def test_para_json_igual_ao_json_dumps():
+    assert Registros(LINHAS).para_json() == json.dumps(LINHAS, separators=(',', ':'))
+
+
+def test_para_json_de_um_intervalo():
+    registros = Registros(LINHAS)
+
+    assert json.loads(registros.para_json(1, 3)) == json.loads(json.dumps(LINHAS[1:3]))
+    assert registros.para_json(4) == '[]'
+
+
+def test_para_json_distingue_booleanos_de_inteiros():
+    # True == 1 e hash(True) == hash(1): o cache de fragmentos não pode confundir os dois
+    registros = Registros([{'ativo': 1}, {'ativo': True}, {'ativo': 1}])
+
+    assert registros.para_json() == '[{"ativo":1},{"ativo":true},{"ativo":1}]'
+
+
+def test_indexar_e_iterar_devolvem_dicts():
+    registros = Registros(LINHAS[:2])
+
+    assert list(registros) == LINHAS[:2]
+    assert registros[1] == LINHAS[1]
+    assert registros[0:1] == LINHAS[:1]
+    assert len(registros) == 2
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+import pytest
+
+from relatorio_http import buscar_relatorio_particionado, gerar_particoes, mesclar_particoes
+
+
+def test_particoes_cobrem_a_janela_sem_sobreposicao():
+    particoes = gerar_particoes(date(2015, 1, 1), date(2016, 3, 15), 6)
+
+    assert particoes == [
+        (date(2015, 1, 1), date(2015, 6, 30)),
+        (date(2015, 7, 1), date(2015, 12, 31)),
+        (date(2016, 1, 1), date(2016, 3, 15)),
+    ]
+
+
+def test_particoes_abertas_cobrem_as_pontas():
+    inicio, fim = date(2015, 1, 1), date(2016, 3, 15)
+    particoes = gerar_particoes(inicio, fim, 6, abertas=True)
+
+    assert particoes[0] == (None, inicio - timedelta(days=1))
+    assert particoes[-1] == (fim + timedelta(days=1), None)
+    assert particoes[1:-1] == gerar_particoes(inicio, fim, 6)
+    # Cada partição começa no dia seguinte ao fim da anterior
+    for (_, fim_anterior), (inicio_seguinte, _) in zip(particoes, particoes[1:]):
+        assert inicio_seguinte == fim_anterior + timedelta(days=1)
+
+
+def test_mesclar_descarta_repetidas_nas_bordas():
+    borda = ['30/06/2015', '1']
+    partes = [[['01/01/2015', '0'], borda], [borda, ['01/07/2015', '2']]]
+
+    assert mesclar_particoes(partes) == [['01/01/2015', '0'], borda, ['01/07/2015', '2']]
+
+
+def test_mesclar_mantem_repeticoes_dentro_da_particao():
+    repetida = ['30/06/2015', '1']
+    partes = [[repetida, repetida], [repetida], [repetida, repetida, repetida]]
+
+    # Cada linha aparece tantas vezes quanto na partição em que mais aparece
+    assert mesclar_particoes(partes) == [repetida] * 3
+
+
+def _buscar(sessao, **opcoes):
+    particoes = gerar_particoes(date(2015, 1, 1), date.today() + timedelta(days=366), 6, abertas=True)
+    return buscar_relatorio_particionado(sessao, 'comissoes', 'dt_ini', 'dt_fim', particoes, trabalhadores=4, **opcoes)
+
+
+def test_particionado_traz_datas_fora_da_janela(servidor_sixvox, sessao_falsa):
+    linhas = _buscar(sessao_falsa)
+
+    esperadas = sorted([data.strftime('%d/%m/%Y'), valor] for data, valor in servidor_sixvox.linhas)
+    assert sorted(linhas) == esperadas
+
+
+def test_particionado_faz_um_login_por_trabalhador(servidor_sixvox, sessao_falsa):
+    _buscar(sessao_falsa)
+
+    assert 1 <= len(servidor_sixvox.logins) <= 4
+    assert servidor_sixvox.violacoes == []
+
+
+def test_conferencia_aceita_relatorio_completo(servidor_sixvox, sessao_falsa):
+    linhas = _buscar(sessao_falsa, conferir=True)
+
+    assert len(linhas) == len(servidor_sixvox.linhas)
+
+
+def test_conferencia_rejeita_linha_sem_data(servidor_sixvox, sessao_falsa):
+    servidor_sixvox.linhas.append((None, 'sem data'))
+
+    with pytest.raises(Exception, match='incompleto'):
+        _buscar(sessao_falsa, conferir=True)
@@ -0,0 +1,18 @@
+from sincronizacao import _filtro_grupos
+
+
+def test_filtro_de_chave_simples():
+    assert _filtro_grupos(('proposta',), [('1',), ('2',)]) == 'proposta.eq."1",proposta.eq."2"'
+
+
+def test_filtro_de_chave_composta_e_nulos():
+    filtro = _filtro_grupos(('proposta', 'parcela'), [('1', '2'), ('3', None)])
+
+    assert filtro == 'and(proposta.eq."1",parcela.eq."2"),and(proposta.eq."3",parcela.is.null)'
+
+
+def test_filtro_escapa_aspas_e_barras():
+    filtro = _filtro_grupos(('corretor',), [('Ana "A", (12)',), ('C:\\dir',)])
+
+    # Vírgulas e parênteses ficam protegidos pelas aspas; aspas e barras são escapadas com barra
+    assert filtro == 'corretor.eq."Ana \\"A\\", (12)",corretor.eq."C:\\\\dir"'
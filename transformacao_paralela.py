@@ -0,0 +1,88 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import time
+
+# Função de transformação do processo trabalhador, definida uma vez pelo initializer do pool
+_processar_bloco = None
+
+
+def _iniciar_trabalhador(processar_bloco):
+    global _processar_bloco
+    _processar_bloco = processar_bloco
+
+
+def _executar_bloco(bloco, inicio):
+    return _processar_bloco(bloco, inicio)
+
+
+def transformar_em_paralelo(processar_bloco, linhas, trabalhadores=None, tamanho_bloco=5000):
+    """Divide `linhas` em blocos e transforma cada um em um processo separado.
+
+    `processar_bloco(bloco, inicio)` recebe as linhas do bloco e a posição da primeira delas em `linhas`, e
+    devolve (registros, erros). Retorna todos os registros na ordem original e {número do bloco: erros};
+    um bloco que falha por inteiro entra nos erros e não interrompe os demais.
+    """
+    inicio = time.monotonic()
+    registros = []
+    erros = {}
+
+    with ProcessPoolExecutor(max_workers=trabalhadores, initializer=_iniciar_trabalhador,
+                             initargs=(processar_bloco,)) as executor:
+        futuros = [
+            executor.submit(_executar_bloco, linhas[posicao:posicao + tamanho_bloco], posicao)
+            for posicao in range(0, len(linhas), tamanho_bloco)
+        ]
+        # Resultados consumidos na ordem de envio, não na de conclusão, para manter a ordem das linhas
+        for numero, futuro in enumerate(futuros):
+            try:
+                bloco_registros, bloco_erros = futuro.result()
+            except Exception as e:
+                logging.error(f"Erro ao transformar bloco {numero + 1}: {str(e)}")
+                erros[numero] = [str(e)]
+                continue
+            registros.extend(bloco_registros)
+            if bloco_erros:
+                erros[numero] = bloco_erros
+
+    logging.info(
+        f"{len(linhas)} linhas transformadas em {len(futuros)} blocos paralelos em {time.monotonic() - inicio:.2f}s "
+        f"({len(registros)} registros, {len(erros)} blocos com erros)"
+    )
+    return registros, erros
+
+
+if __name__ == "__main__":
+    # Benchmark: transformação serial vs. em processos do relatório de comissões, por quantidade de linhas
+    import os
+
+    from functools import partial
+
+    from automacao_comissao_2 import processar_lote_em_processo
+
+    logging.disable(logging.CRITICAL)
+
+    def linha(i):
+        return [
+            f'{i % 28 + 1:02d}/11/2015', 'Ativa', f'Corretor {i % 300} ({i % 300})', str(i), 'TITULAR', 'PF',
+            'HAPVIDA CLINIPAM (266)', '-DIRETO', '1', f'R$ {i % 9:d}.{i % 1000:03d},{i % 100:02d}',
+            f'{i % 28 + 1:02d}/12/2024', '100,00%', f'R$ {i % 1000},41', f'{i % 100},5%', 'R$ 737,94',
+            'R$ 737,94', 'Supervisor (4489)', '', 'Equipe (37)', '12387735838', '06/11/2024', '956', '664',
+            'INDIVIDUAL SAÚDE (182)', '1', '15/11/2024', 'R$ 0,00', 'R$ 0,00', 'R$ 0,00', 'R$ 0,00', 'DIAMOND',
+        ]
+
+    print(f"{os.cpu_count()} CPUs")
+    for quantidade in (2_000, 10_000, 50_000, 200_000):
+        linhas = [linha(i) for i in range(quantidade)]
+
+        inicio = time.perf_counter()
+        serial = []
+        for posicao in range(0, len(linhas), 100):
+            serial.extend(processar_lote_em_processo(False, linhas[posicao:posicao + 100], posicao)[0])
+        duracao_serial = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        paralelo, _ = transformar_em_paralelo(partial(processar_lote_em_processo, False), linhas)
+        duracao_paralela = time.perf_counter() - inicio
+
+        assert paralelo == serial
+        print(f"{quantidade:>7} linhas: serial {duracao_serial:.2f}s, processos {duracao_paralela:.2f}s")
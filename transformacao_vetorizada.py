@@ -0,0 +1,202 @@
+from collections import defaultdict
+import logging
+
+import pandas as pd
+
+# Cada conversor vetorizado recebe a coluna bruta (Series de str) e devolve (resultado, pendentes):
+# os valores marcados como pendentes são convertidos pelo conversor linha a linha do Campo, o que mantém
+# a saída idêntica à do caminho atual mesmo para células fora do formato esperado.
+
+PADRAO_INTEIRO = r'^\s*[+-]?[0-9]+\s*$'
+PADRAO_DECIMAL = r'^\s*[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?\s*$'
+
+
+def _preencher(serie, vazio, mascara, valores):
+    """Série com `vazio` em tudo e `valores` (já convertidos para tipos Python) nas posições da máscara"""
+    resultado = pd.Series(vazio, index=serie.index, dtype=object)
+    if mascara.any():
+        resultado[mascara] = valores(serie[mascara].str.strip()).tolist()
+    return resultado
+
+
+def _numerico(limpo, vazio):
+    """float() do texto já normalizado; vazio vira `vazio` e o que fugir do formato decimal fica pendente"""
+    # astype('float64') usa o mesmo arredondamento do float(); pd.to_numeric perde dígitos em alguns casos
+    validos = limpo.str.match(PADRAO_DECIMAL)
+    em_branco = limpo.eq('')
+    return _preencher(limpo, vazio, validos, lambda v: v.astype('float64')), ~(validos | em_branco)
+
+
+def monetario(serie):
+    """'R$ 1.234,56' -> 1234.56"""
+    limpo = (serie.str.replace('R$', '', regex=False).str.strip()
+             .str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    return _numerico(limpo, 0.0)
+
+
+def percentual(serie):
+    """'12,5%' -> 12.5, como o safe_percent_convert"""
+    limpo = serie.str.replace('%', '', regex=False).str.replace(',', '.', regex=False).str.strip()
+    return _numerico(limpo, 0.0)
+
+
+def percentual_simples(serie):
+    """float(valor.replace('%', '') or 0); vírgula decimal fica pendente para o conversor original decidir"""
+    limpo = serie.str.replace('%', '', regex=False)
+    resultado, pendentes = _numerico(limpo, 0.0)
+    return resultado, pendentes | limpo.str.contains(',', regex=False)
+
+
+def inteiro(serie):
+    """int(valor or 0): só dígitos são convertidos aqui, o resto segue para o conversor original"""
+    validos = serie.str.match(PADRAO_INTEIRO)
+    em_branco = serie.eq('')
+    return _preencher(serie, 0, validos, lambda v: v.astype('int64')), ~(validos | em_branco)
+
+
+def inteiro_digitos(serie):
+    """safe_int_convert: mantém só os dígitos de cada célula; vazio vira 0"""
+    digitos = serie.str.replace(r'[^0-9]', '', regex=True)
+    resultado = _preencher(digitos, 0, digitos.ne(''), lambda v: v.astype('int64'))
+    # Dígitos não ASCII ('²', '٣') têm tratamento próprio no conversor original
+    return resultado, serie.str.contains(r'[^\x00-\x7f]', regex=True)
+
+
+def data(formato_saida):
+    """DD/MM/YYYY -> `formato_saida`; vazio vira None e outros formatos ficam pendentes"""
+    def converter(serie):
+        limpo = serie.str.strip()
+        datas = pd.to_datetime(limpo, format='%d/%m/%Y', errors='coerce')
+        resultado = datas.dt.strftime(formato_saida).astype(object)
+        em_branco = limpo.eq('')
+        return resultado.where(datas.notna(), None), datas.isna() & ~em_branco
+    return converter
+
+
+def sku(serie):
+    """Valor entre parênteses, como o extrair_sku; sem parênteses vira None"""
+    resultado = serie.str.extract(r'\((.*?)\)', expand=False)
+    return resultado.astype(object).where(resultado.notna(), None), pd.Series(False, index=serie.index)
+
+
+def texto(serie):
+    return serie.str.strip(), pd.Series(False, index=serie.index)
+
+
+def sem_codigo(serie):
+    """'Fulano (123)' -> 'Fulano'"""
+    return serie.str.split(' (', n=1, regex=False).str[0], pd.Series(False, index=serie.index)
+
+
+def _converter_formato(esquema, linhas):
+    """Converte linhas com a mesma quantidade de colunas; retorna a lista de registros na mesma ordem"""
+    n_colunas = len(linhas[0])
+    quadro = pd.DataFrame(linhas, dtype=object)
+    valores = {}
+
+    for campo in esquema.campos:
+        if campo.coluna is None or campo.coluna >= n_colunas:
+            valores[campo.nome] = [campo.padrao] * len(linhas)
+            continue
+
+        bruto = quadro[campo.coluna]
+        if campo.conversor is None:
+            valores[campo.nome] = bruto.tolist()
+        elif campo.vetorizado is None:
+            # Series.map trocaria os None do conversor por NaN
+            valores[campo.nome] = [campo.conversor(valor) for valor in bruto.tolist()]
+        else:
+            resultado, pendentes = campo.vetorizado(bruto)
+            coluna = resultado.tolist()
+            for posicao in pendentes.to_numpy().nonzero()[0]:
+                coluna[posicao] = campo.conversor(bruto.iat[posicao])
+            valores[campo.nome] = coluna
+
+    nomes = list(valores)
+    return [dict(zip(nomes, registro)) for registro in zip(*valores.values())]
+
+
+def converter_lote(esquema, linhas):
+    """Converte um lote inteiro coluna a coluna; None se algum valor falhar, para o lote seguir linha a linha"""
+    try:
+        por_formato = defaultdict(list)
+        for posicao, linha in enumerate(linhas):
+            por_formato[len(linha)].append(posicao)
+
+        registros = [None] * len(linhas)
+        for posicoes in por_formato.values():
+            convertidos = _converter_formato(esquema, [linhas[posicao] for posicao in posicoes])
+            for posicao, registro in zip(posicoes, convertidos):
+                registros[posicao] = registro
+        return registros
+    except Exception as e:
+        logging.warning(f"Conversão vetorizada falhou, lote será processado linha a linha: {str(e)}")
+        return None
+
+
+if __name__ == "__main__":
+    # Benchmark: esquema compilado linha a linha vs. conversão vetorizada, com linhas no formato do relatório 64
+    import re
+    import time
+    from datetime import datetime
+
+    from esquema import Campo, Esquema
+
+    def limpar_valor_monetario(valor):
+        valor = valor.replace('R$', '').replace('.', '').replace(',', '.').strip()
+        try:
+            return float(valor)
+        except ValueError:
+            return 0.0
+
+    def converter_data(data_str):
+        if not data_str or data_str.strip() == '':
+            return None
+        try:
+            return datetime.strptime(data_str.strip(), '%d/%m/%Y').strftime('%Y-%m-%d')
+        except ValueError:
+            return None
+
+    def extrair_sku(texto):
+        if not texto:
+            return None
+        match = re.search(r'\((.*?)\)', texto)
+        return match.group(1) if match else None
+
+    def converter_percentual(valor):
+        valor = valor.replace('%', '').replace(',', '.').strip()
+        return float(valor) if valor else 0.0
+
+    esquema = Esquema([
+        Campo('vigencia', 0, converter_data, vetorizado=data('%Y-%m-%d')),
+        Campo('corretor', 2, str.strip, '', texto),
+        Campo('sku_corretor', 2, extrair_sku, vetorizado=sku),
+        Campo('operadora', 6, str.strip, '', texto),
+        Campo('sku_operadora', 6, extrair_sku, vetorizado=sku),
+        Campo('base_de_calculo', 9, limpar_valor_monetario, 0.0, monetario),
+        Campo('data_repasse', 10, converter_data, vetorizado=data('%Y-%m-%d')),
+        Campo('percentual_comissao', 11, converter_percentual, 0.0, percentual),
+        Campo('valor_comissao', 12, limpar_valor_monetario, 0.0, monetario),
+        Campo('percentual_corretor', 13, converter_percentual, 0.0, percentual),
+        Campo('comissao_paga_corretor', 14, limpar_valor_monetario, 0.0, monetario),
+        Campo('data_cadastro', 20, converter_data, vetorizado=data('%Y-%m-%d')),
+    ])
+
+    linhas = [
+        [f'{i % 28 + 1:02d}/11/2015', 'Ativa', f'Corretor {i % 300} ({i % 300})', str(i), 'TITULAR', 'PF',
+         'HAPVIDA CLINIPAM (266)', '-DIRETO', '1', f'R$ {i % 9:d}.{i % 1000:03d},{i % 100:02d}',
+         f'{i % 28 + 1:02d}/12/2024', '100,00%', f'R$ {i % 1000},41', f'{i % 100},5%', 'R$ 737,94',
+         'R$ 737,94', 'Supervisor (4489)', '', 'Equipe (37)', '12387735838', '06/11/2024']
+        for i in range(100_000)
+    ]
+    assert converter_lote(esquema, linhas[:1000]) == [esquema.converter(linha) for linha in linhas[:1000]]
+
+    for nome, funcao in (
+        ("esquema linha a linha", lambda lote: [esquema.converter(linha) for linha in lote]),
+        ("vetorizado", lambda lote: converter_lote(esquema, lote)),
+    ):
+        inicio = time.perf_counter()
+        for posicao in range(0, len(linhas), 5000):
+            funcao(linhas[posicao:posicao + 5000])
+        duracao = time.perf_counter() - inicio
+        print(f"{nome}: {len(linhas) / duracao:,.0f} linhas/s")
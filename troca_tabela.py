@@ -0,0 +1,84 @@
+"""Recarga completa por tabela de preparação, publicada de uma vez só.
+
+Os registros são gravados em `<tabela>_carga` enquanto a tabela principal continua com o conteúdo anterior;
+no fim, `publicar_carga` troca o conteúdo dentro de uma transação. Leitores veem o relatório antigo ou o
+novo, nunca a tabela vazia ou pela metade, e o DELETE linha a linha sai da execução. Se a carga falhar,
+nada é publicado.
+
+A troca copia as linhas dentro do banco em vez de renomear as tabelas: renomear faria views, políticas de
+RLS e o cache de esquema do PostgREST continuarem apontando para a tabela antiga.
+
+As funções e as tabelas de preparação ficam restritas ao service_role: com elas, quem tivesse a chave
+anônima poderia preencher a preparação e publicar qualquer conteúdo no lugar da tabela principal. As
+funções rodam com os privilégios de quem chama (sem `security definer`), então a troca exige que o
+scraper use a chave service_role do projeto.
+
+Preparação no banco (SQL editor do Supabase), uma vez por tabela e uma vez para as funções:
+
+    create table vendas_carga as select * from vendas with no data;
+    alter table vendas_carga drop column id;
+    alter table vendas_carga enable row level security;
+    revoke all on vendas_carga from public, anon, authenticated;
+
+    create or replace function preparar_carga(tabela text) returns table (linhas bigint)
+    language plpgsql as $$
+    begin
+      if tabela not in ('vendas', 'comissoes', 'dimensao_comissao') then
+        raise exception 'tabela não permitida: %', tabela;
+      end if;
+      return query execute format('select count(*) from %I', tabela || '_carga');
+      execute format('truncate %I', tabela || '_carga');
+    end $$;
+
+    create or replace function publicar_carga(tabela text) returns table (linhas bigint)
+    language plpgsql as $$
+    declare
+      colunas text;
+      copiadas bigint;
+    begin
+      if tabela not in ('vendas', 'comissoes', 'dimensao_comissao') then
+        raise exception 'tabela não permitida: %', tabela;
+      end if;
+      select string_agg(quote_ident(column_name), ', ' order by ordinal_position) into colunas
+        from information_schema.columns
+       where table_schema = 'public' and table_name = tabela || '_carga';
+      execute format('truncate %I', tabela);
+      execute format('insert into %I (%s) select %s from %I', tabela, colunas, colunas, tabela || '_carga');
+      get diagnostics copiadas = row_count;
+      execute format('truncate %I', tabela || '_carga');
+      return query select copiadas;
+    end $$;
+
+    revoke execute on function preparar_carga(text), publicar_carga(text) from public, anon, authenticated;
+    grant execute on function preparar_carga(text), publicar_carga(text) to service_role;
+"""
+import logging
+import time
+
+
+def tabela_de_carga(tabela):
+    return f"{tabela}_carga"
+
+
+def preparar_carga(cliente, tabela):
+    """Esvazia a tabela de preparação (TRUNCATE, sem DELETE linha a linha)"""
+    restantes = cliente.rpc('preparar_carga', {'tabela': tabela}).execute().data[0]['linhas']
+    if restantes:
+        logging.warning(f"{restantes} linhas de uma carga anterior não publicada descartadas de {tabela_de_carga(tabela)}")
+
+
+def publicar_carga(cliente, tabela, esperadas=None):
+    """Substitui o conteúdo da tabela pelo da preparação em uma transação; retorna as linhas publicadas"""
+    inicio = time.monotonic()
+    linhas = cliente.rpc('publicar_carga', {'tabela': tabela}).execute().data[0]['linhas']
+    logging.info(f"{linhas} linhas publicadas em {tabela} em {time.monotonic() - inicio:.2f}s")
+    if esperadas is not None and linhas != esperadas:
+        logging.warning(f"Publicadas {linhas} linhas em {tabela}, eram esperadas {esperadas}")
+    return linhas
+
+
+def recarregar_com_troca(cliente, carregador, tabela, registros):
+    """Grava os registros na tabela de preparação e publica; a tabela principal só muda se tudo foi gravado"""
+    preparar_carga(cliente, tabela)
+    carregador.inserir(tabela_de_carga(tabela), registros)
+    return publicar_carga(cliente, tabela, len(registros))